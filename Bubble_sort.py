@@ -1,6 +1,24 @@
-def bubble_sort(capitals):
+from sort_engine import sort_in_place
+
+def bubble_sort(capitals, key=None, reverse=False):
+  """
+  Sorts a list of items in place.
+
+  Bubble Sort takes O(n^2) time, so this now hands the work to the shared sort engine,
+  which takes O(n log n) time (O(n) if the list is already sorted). The sort is stable.
+
+  Args:
+    capitals: A list of items to be sorted.
+              The items are compared using the '<' operator.
+    key: Optional function computing the value to compare for each item.
+    reverse: If True, sort in descending order.
+  """
+  sort_in_place(capitals, key=key, reverse=reverse)
+
+def bubble_sort_classic(capitals):
   """
   Sorts a list of items using the Bubble Sort algorithm.
+  Kept for teaching and for comparison in benchmarks.
 
   Args:
     capitals: A list of items to be sorted.
@@ -10,12 +28,17 @@ def bubble_sort(capitals):
 
   # Traverse through all array elements
   for i in range(n - 1):
+    swapped = False
     # Last i elements are already in place, so we don't need to check them
     for j in range(n - i - 1):
       # Traverse the array from 0 to n-i-1
       # Swap if the element found is greater than the next element
       if capitals[j] > capitals[j + 1]:
         capitals[j], capitals[j + 1] = capitals[j + 1], capitals[j]
+        swapped = True
+    # No swaps in a whole pass means the list is already sorted
+    if not swapped:
+      break
 
 # Example usage:
 if __name__ == "__main__":
@@ -1,6 +1,17 @@
-def selection_sort(scores):
+from sort_engine import sort_in_place, sorted_copy
+
+def selection_sort(scores, key=None, reverse=False):
+    """
+    Sorts a list of scores in ascending order (descending if reverse is True) and returns it.
+    The list is sorted in place by the shared sort engine in O(n log n) time.
+    """
+    sort_in_place(scores, key=key, reverse=reverse)
+    return scores
+
+def selection_sort_classic(scores):
     """
     Sorts a list of scores in ascending order using the Selection Sort algorithm.
+    Kept for teaching and for comparison in benchmarks.
     """
     n = len(scores)
     for i in range(n):
@@ -20,8 +31,8 @@ student_scores = [75, 92, 88, 65, 95, 70, 80, 60]
 # Display original list
 print("Original student scores:", student_scores)
 
-# Sort the data using the implemented Selection Sort algorithm
-sorted_scores = selection_sort(list(student_scores)) # Create a copy to keep original intact
+# Sort a copy of the data, keeping the original intact (large score lists are counting-sorted in linear time)
+sorted_scores = sorted_copy(student_scores)
 
 # Display sorted list
 print("Sorted student scores (ascending):", sorted_scores)
\ No newline at end of file
@@ -1,8 +1,13 @@
+import argparse
+
+from support_queue import DurableSupportQueue, QueueFull, SupportQueue, TieredSupportQueue
+
 # Function to display the current state of the queue
 def display_queue(queue):
     """
     Prints the current state of the customer support queue.
-    If the queue is empty, it indicates that.
+    If the queue is empty, it indicates that. Long queues are summarized (length plus the
+    customers at each end), so displaying costs the same however many customers are waiting.
     """
     if not queue:
         print("Queue: [] (The queue is empty)")
@@ -10,13 +15,28 @@ def display_queue(queue):
         print(f"Queue: {queue}")
 
 # Function to add a customer to the queue
-def customer_submits_inquiry(queue, customer_id):
+def customer_submits_inquiry(queue, customer_id, tier=None):
     """
     Adds a customer to the end of the queue and displays the updated queue.
+    If the queue is full, the customer is turned away.
+    For a TieredSupportQueue, tier chooses the customer's lane (e.g. "VIP").
     """
     print(f"\n--- Event: Customer '{customer_id}' submits an inquiry ---")
-    queue.append(customer_id) # Add customer to the end of the list (queue)
-    print(f"'{customer_id}' has been added to the queue.")
+    try:
+        if tier is None:
+            queue.enqueue(customer_id) # Add customer to the end of the queue in O(1)
+        else:
+            queue.enqueue(customer_id, tier=tier)
+    except QueueFull as e:
+        print(f"Sorry '{customer_id}', please try again later. {e}")
+        return
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    if tier is None:
+        print(f"'{customer_id}' has been added to the queue.")
+    else:
+        print(f"'{customer_id}' has been added to the {tier} queue.")
     display_queue(queue)
 
 # Function for an agent to process an inquiry
@@ -27,18 +47,26 @@ def agent_processes_inquiry(queue):
     """
     print("\n--- Event: An agent becomes free and processes an inquiry ---")
     if queue:
-        processed_customer = queue.pop(0) # Remove customer from the front of the list (queue)
+        processed_customer = queue.dequeue() # Remove customer from the front of the queue in O(1)
         print(f"Agent processed inquiry from '{processed_customer}'.")
     else:
         print("No customers in the queue to process.")
     display_queue(queue)
 
 # --- Simulation Start ---
+parser = argparse.ArgumentParser(description="Simulate the customer support queue.")
+parser.add_argument("--persist", metavar="DIRECTORY", default=None,
+                    help="keep the queue on disk in DIRECTORY, so waiting customers survive a restart")
+args = parser.parse_args()
+
 print("Simulating the Happy Customer Support Queue:")
 
-# Initialize the empty queued   
-customer_queue = []
-display_queue(customer_queue) # Show initial empty queue
+# Initialize the queue (empty, unless customers were left waiting in a persisted one)
+if args.persist:
+    customer_queue = DurableSupportQueue(args.persist)
+else:
+    customer_queue = SupportQueue()
+display_queue(customer_queue) # Show initial queue
 
 # 1. Customer "Alice" submits an inquiry.
 customer_submits_inquiry(customer_queue, "Alice")
@@ -58,6 +86,29 @@ agent_processes_inquiry(customer_queue)
 # 6. Customer "David" submits an inquiry.
 customer_submits_inquiry(customer_queue, "David")
 
+if args.persist:
+    customer_queue.close() # Flush to disk; David will still be waiting on the next run
+
 print("\n--- Simulation End ---")
 
-hello
\ No newline at end of file
+# --- Tiered Simulation Start ---
+print("\nSimulating VIP and SLA tiers:")
+
+# Initialize the empty tiered queue (VIP, SLA and Standard lanes)
+tiered_queue = TieredSupportQueue()
+
+# 1. Standard customer "Erin", VIP "Frank" and SLA customer "Grace" submit inquiries.
+customer_submits_inquiry(tiered_queue, "Erin")
+customer_submits_inquiry(tiered_queue, "Frank", tier="VIP")
+customer_submits_inquiry(tiered_queue, "Grace", tier="SLA")
+
+# 2. Check Erin's place in the Standard lane.
+erin_tier, erin_place = tiered_queue.position("Erin")
+print(f"\n'Erin' is number {erin_place} in the {erin_tier} queue.")
+
+# 3. Agents process inquiries: Frank (VIP) goes first, then Grace (SLA), then Erin.
+agent_processes_inquiry(tiered_queue)
+agent_processes_inquiry(tiered_queue)
+agent_processes_inquiry(tiered_queue)
+
+print("\n--- Tiered Simulation End ---")
\ No newline at end of file
@@ -1,6 +1,25 @@
-def selection_sort(arr):
+from sort_engine import sort_in_place
+
+def selection_sort(arr, key=None, reverse=False):
+  """
+  Sorts a list of items in place.
+
+  Selection Sort takes O(n^2) time even on sorted input, so this now hands the work to the
+  shared sort engine, which takes O(n log n) time (O(n) if the list is already sorted).
+  Unlike Selection Sort, the sort is stable.
+
+  Args:
+    arr: A list of items to be sorted.
+         The items are compared using the '<' operator.
+    key: Optional function computing the value to compare for each item.
+    reverse: If True, sort in descending order.
+  """
+  sort_in_place(arr, key=key, reverse=reverse)
+
+def selection_sort_classic(arr):
   """
   Sorts a list of items using the Selection Sort algorithm.
+  Kept for teaching and for comparison in benchmarks.
 
   Args:
     arr: A list of items to be sorted.
@@ -0,0 +1,698 @@
+"""
+Shared ID search functions used by Student ID Search.py.
+
+binary_search looks up one ID; search_many looks up a whole batch of IDs in one call.
+IdIndex is a compact, read-optimized index for very large rosters that can be saved to
+and memory-mapped from disk; SortedIdSet is a sorted roster that IDs can be added to and
+removed from without re-sorting. An IdBloomFilter can sit in front of binary_search (and of
+search_many when NumPy is installed) to answer most lookups of missing IDs without searching at all.
+"""
+
+import math
+import mmap
+import operator
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress, islice, repeat
+
+try:
+    import numpy
+except ImportError: # NumPy is optional; without it batches are searched with the bisect module
+    numpy = None
+
+# --- Global Variables ---
+MERGE_FACTOR = 4 # A sorted batch is merged when m * log2(n) binary-search steps cost more than MERGE_FACTOR * (n + m) merge steps
+INDEX_MAGIC = b'IDIX'
+INDEX_HEADER = struct.Struct('<4sBBxxQqQ') # magic, version, layout, padding, count, interpolation error, reserved (32 bytes, keeps IDs 8-byte aligned)
+INDEX_VERSION = 1
+LAYOUTS = ("sorted", "eytzinger")
+UNIFORM_SAMPLES = 64 # Points checked when deciding whether IDs are spread evenly enough for interpolation search
+UNIFORM_TOLERANCE = 0.01 # Largest allowed gap (as a fraction of the ID count) between a sample's real and predicted position
+BLOOM_MAGIC = b'IDBF'
+BLOOM_HEADER = struct.Struct('<4sBxxxQQQ') # magic, version, padding, bit count, hash count, ID count
+BLOOM_VERSION = 1
+DEFAULT_FALSE_POSITIVE_RATE = 0.01 # Share of missing IDs a Bloom filter lets through to the real search
+MASK64 = (1 << 64) - 1
+BLOCK_SIZE = 1000 # Target IDs per block of a SortedIdSet; blocks split at twice this and merge below half
+INTERPOLATION_WINDOW = 32 # Smallest number of positions either side of an interpolation guess that are searched
+
+def binary_search(sorted_list, target_id, membership_filter=None):
+    """
+    Implements the binary search algorithm to find a target_id in a sorted list.
+
+    Args:
+        sorted_list: A list of unique integer student IDs, sorted in ascending order.
+        target_id: The student ID to search for.
+        membership_filter: Optional IdBloomFilter built from sorted_list. IDs it rules out
+                           are reported as not found without searching the list.
+
+    Returns:
+        A tuple: (True, index) if target_id is found, where index is its position.
+                  (False, -1) if target_id is not found.
+    """
+    if membership_filter is not None and target_id not in membership_filter:
+        return False, -1
+
+    low = 0
+    high = len(sorted_list) - 1
+
+    while low <= high:
+        mid = (low + high) // 2  # Calculate the middle index
+        mid_id = sorted_list[mid]
+
+        if mid_id == target_id:
+            # Target ID found at the middle index
+            return True, mid
+        elif mid_id < target_id:
+            # Target ID is in the upper half, adjust low boundary
+            low = mid + 1
+        else:
+            # Target ID is in the lower half, adjust high boundary
+            high = mid - 1
+    
+    # Target ID not found in the list
+    return False, -1
+
+def search_many(sorted_list, target_ids, membership_filter=None):
+    """
+    Looks up a batch of target IDs in a sorted list in one call.
+
+    Unsorted batches are binary-searched by the C bisect module (or NumPy's searchsorted when
+    sorted_list is a NumPy array or integer array.array), so no Python code runs per lookup.
+    Sorted batches that are large compared with the list are found in a single linear merge
+    pass instead, in O(n + m) rather than O(m log n) time.
+
+    Args:
+        sorted_list: A sequence of unique student IDs, sorted in ascending order.
+        target_ids: The student IDs to search for, in any order.
+        membership_filter: Optional IdBloomFilter built from sorted_list. Only the IDs it
+                           cannot rule out are searched for. It is checked for the whole batch
+                           at once with NumPy; without NumPy, hashing each ID in Python costs
+                           more than the search it would save, so the filter is not used.
+
+    Returns:
+        A tuple of two lists (NumPy arrays on the NumPy path without a filter): found flags,
+        and the index of each target in sorted_list, or -1 for targets that were not found.
+    """
+    if membership_filter is not None and numpy is not None:
+        maybe_present = membership_filter.contains_many(target_ids)
+        candidates = list(compress(target_ids, maybe_present))
+        candidate_found, candidate_indices = search_many(sorted_list, candidates)
+        found = [False] * len(maybe_present)
+        indices = [-1] * len(maybe_present)
+        for slot, is_found, index in zip(compress(range(len(maybe_present)), maybe_present),
+                                         candidate_found, candidate_indices):
+            found[slot] = bool(is_found)
+            indices[slot] = int(index)
+        return found, indices
+
+    if numpy is not None and (isinstance(sorted_list, numpy.ndarray) or
+                              (isinstance(sorted_list, array) and sorted_list.typecode in 'bBhHiIlLqQ')):
+        return _search_many_numpy(numpy.asarray(sorted_list), target_ids)
+
+    n = len(sorted_list)
+    m = len(target_ids)
+    is_sorted = all(map(operator.le, target_ids, islice(target_ids, 1, None)))
+    if is_sorted and n and m * math.log2(n + 1) > MERGE_FACTOR * (n + m):
+        positions = _merge_positions(sorted_list, target_ids)
+    else:
+        positions = list(map(bisect_left, repeat(sorted_list), target_ids))
+
+    found = [position < n and sorted_list[position] == target_id for position, target_id in zip(positions, target_ids)]
+    indices = [position if is_found else -1 for position, is_found in zip(positions, found)]
+    return found, indices
+
+def _merge_positions(sorted_list, sorted_targets):
+    """Returns bisect_left positions for a sorted batch by walking both sequences once."""
+    positions = []
+    add = positions.append
+    position = 0
+    n = len(sorted_list)
+    for target_id in sorted_targets:
+        while position < n and sorted_list[position] < target_id:
+            position += 1
+        add(position)
+    return positions
+
+def _search_many_numpy(ids, target_ids):
+    """Batch lookup with NumPy's searchsorted, which also takes advantage of sorted batches."""
+    targets = numpy.asarray(target_ids)
+    positions = numpy.searchsorted(ids, targets)
+    in_range = positions < len(ids)
+    found = numpy.zeros(len(targets), dtype=bool)
+    found[in_range] = ids[positions[in_range]] == targets[in_range]
+    return found, numpy.where(found, positions, -1)
+
+# --- Bloom Filter ---
+
+class IdBloomFilter:
+    """
+    A Bloom filter of integer IDs: a compact bit array that says for certain when an ID is
+    *not* in the roster, and "maybe" otherwise. Checking it costs a handful of bit lookups no
+    matter how big the roster is, so putting it in front of a search (see binary_search's
+    membership_filter argument) answers most misses without searching.
+
+    At most false_positive_rate of the missing IDs get a "maybe" and go on to the real search,
+    which then reports them as not found; IDs in the roster always get a "maybe". IDs cannot be
+    removed, so rebuild the filter when IDs leave the roster.
+    """
+    def __init__(self, capacity, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        """
+        Creates an empty filter sized for capacity IDs at the given false positive rate,
+        using the standard optimal sizes: m = -n ln p / (ln 2)^2 bits and k = (m / n) ln 2 hashes.
+        """
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        capacity = max(1, capacity)
+        self.bit_count = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.bit_count + 7) // 8)
+
+    @classmethod
+    def from_ids(cls, ids, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        """Builds a filter holding every ID in ids (e.g. student_ids)."""
+        bloom = cls(len(ids), false_positive_rate)
+        positions = bloom._bit_positions_many(ids)
+        if positions is None:
+            for target_id in ids:
+                bloom.add(target_id)
+        else:
+            flags = numpy.zeros(bloom.bit_count, dtype=bool)
+            flags[positions.ravel()] = True
+            bloom._bits = bytearray(numpy.packbits(flags, bitorder='little').tobytes())
+            bloom.count = len(ids)
+        return bloom
+
+    @classmethod
+    def load(cls, path):
+        """Reads a filter written by save()."""
+        with open(path, 'rb') as f:
+            header = f.read(BLOOM_HEADER.size)
+            if len(header) < BLOOM_HEADER.size:
+                raise ValueError(f"{path} is not an ID Bloom filter file")
+            magic, version, bit_count, hash_count, count = BLOOM_HEADER.unpack(header)
+            if magic != BLOOM_MAGIC or version != BLOOM_VERSION:
+                raise ValueError(f"{path} is not an ID Bloom filter file")
+            bits = bytearray(f.read())
+        if len(bits) != (bit_count + 7) // 8:
+            raise ValueError(f"{path} is truncated")
+        bloom = cls.__new__(cls)
+        bloom.bit_count = bit_count
+        bloom.hash_count = hash_count
+        bloom.count = count
+        bloom._bits = bits
+        return bloom
+
+    def save(self, path):
+        """Writes the filter to path (atomically), e.g. next to the roster as 'roster.bloom'."""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, BLOOM_VERSION, self.bit_count, self.hash_count, self.count))
+            f.write(self._bits)
+        os.replace(temp_path, path)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, target_id):
+        """Adds an ID to the filter."""
+        bits = self._bits
+        for bit in self._bit_positions(target_id):
+            bits[bit >> 3] |= 1 << (bit & 7)
+        self.count += 1
+
+    def __contains__(self, target_id):
+        """False if target_id is definitely not in the filter; True if it may be."""
+        bits = self._bits
+        for bit in self._bit_positions(target_id):
+            if not bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def contains_many(self, target_ids):
+        """Checks a batch of IDs at once, returning a list of flags like __contains__ for each."""
+        positions = self._bit_positions_many(target_ids)
+        if positions is None:
+            return list(map(self.__contains__, target_ids))
+        bits = numpy.frombuffer(self._bits, dtype=numpy.uint8)
+        maybe_present = numpy.ones(positions.shape[1], dtype=bool)
+        for row in positions:
+            shift = (row & numpy.uint64(7)).astype(numpy.uint8)
+            maybe_present &= ((bits[row >> numpy.uint64(3)] >> shift) & 1).astype(bool)
+        return maybe_present.tolist()
+
+    def _bit_positions(self, target_id):
+        """
+        Yields the hash_count bit positions for an ID from one well-mixed 64-bit hash, using
+        enhanced double hashing (each step grows by one more than the last) instead of
+        hash_count separate hash functions.
+        """
+        # splitmix64 finalizer: spreads consecutive IDs like 101, 102, 103 over the whole bit array
+        z = (target_id + 0x9E3779B97F4A7C15) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        z ^= z >> 31
+        m = self.bit_count
+        position = (z & 0xFFFFFFFF) % m
+        step = (z >> 32) % m
+        for i in range(self.hash_count):
+            yield position
+            position = (position + step) % m
+            step = (step + i + 1) % m
+
+    def _bit_positions_many(self, target_ids):
+        """
+        _bit_positions for a whole batch, computed by NumPy: returns a (hash_count, len(target_ids))
+        array of bit positions, or None without NumPy or if the IDs are not all 64-bit integers.
+        """
+        if numpy is None:
+            return None
+        values = numpy.asarray(target_ids)
+        if values.dtype.kind not in 'iu' or values.ndim != 1:
+            return None
+        u64 = numpy.uint64
+        # The same splitmix64 steps, on unsigned 64-bit arrays whose arithmetic wraps like & MASK64
+        z = values.astype(numpy.int64, copy=False).view(u64) + u64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> u64(30))) * u64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> u64(27))) * u64(0x94D049BB133111EB)
+        z ^= z >> u64(31)
+        m = u64(self.bit_count)
+        position = (z & u64(0xFFFFFFFF)) % m
+        step = (z >> u64(32)) % m
+        positions = numpy.empty((self.hash_count, len(values)), dtype=u64)
+        for i in range(self.hash_count):
+            positions[i] = position
+            position = (position + step) % m
+            step = (step + u64(i + 1)) % m
+        return positions
+
+# --- Compact ID Index ---
+
+class IdIndex:
+    """
+    A read-only index of unique integer IDs, stored packed as 64-bit integers instead of as a
+    list of Python ints. An index saved with save() is memory-mapped by load(), so even a roster
+    of 100 million IDs opens instantly and only the pages a search touches are read from disk.
+
+    Searches keep the binary_search contract: (True, index) with the ID's position in sorted
+    order, or (False, -1). The search strategy is picked from the data:
+      - "eytzinger" layout: IDs are stored in breadth-first (heap) order, so the first levels of
+        every search share the same few cache lines and pages.
+      - evenly spaced IDs (like 101, 105, 112, ...): interpolation search, which guesses where
+        an ID should be from its value and then only binary-searches a small window around it.
+      - anything else: binary search (the C bisect module).
+    """
+    def __init__(self, ids, layout="sorted", is_sorted=False):
+        """
+        Builds an index from any iterable of integer IDs, e.g. map(int, open("roster.txt")),
+        without making a Python list of them.
+
+        Args:
+            ids: The IDs to index (unique integers that fit in 64 bits).
+            layout: "sorted" (the default) or "eytzinger".
+            is_sorted: Pass True if ids are already in ascending order, to skip sorting them.
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout must be one of {LAYOUTS}, not {layout!r}")
+        values = array('q', ids)
+        if not is_sorted:
+            values = array('q', sorted(values))
+        self.layout = layout
+        self.count = len(values)
+        self.interpolation_error = _interpolation_error(values)
+        self._values = _to_eytzinger(values) if layout == "eytzinger" else values
+        self._mmap = None
+
+    @classmethod
+    def load(cls, path):
+        """Opens an index written by save(), memory-mapping its IDs rather than reading them into memory."""
+        with open(path, 'rb') as f:
+            header = f.read(INDEX_HEADER.size)
+            if len(header) < INDEX_HEADER.size:
+                raise ValueError(f"{path} is not an ID index file")
+            magic, version, layout, count, interpolation_error, _ = INDEX_HEADER.unpack(header)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION or layout >= len(LAYOUTS):
+                raise ValueError(f"{path} is not an ID index file")
+            index = cls.__new__(cls)
+            index.layout = LAYOUTS[layout]
+            index.count = count
+            index.interpolation_error = interpolation_error
+            slots = count + 1 if index.layout == "eytzinger" else count
+            if slots:
+                index._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                index._values = memoryview(index._mmap)[INDEX_HEADER.size:INDEX_HEADER.size + slots * 8].cast('q')
+            else:
+                index._mmap = None # mmap cannot map an empty file
+                index._values = array('q')
+        return index
+
+    def save(self, path):
+        """Writes the index to path (atomically), in the format load() reads."""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, LAYOUTS.index(self.layout),
+                                      self.count, self.interpolation_error, 0))
+            f.write(self._values.tobytes() if isinstance(self._values, memoryview) else self._values)
+        os.replace(temp_path, path)
+
+    def close(self):
+        """Releases the memory-mapped file of a loaded index."""
+        if self._mmap is not None:
+            self._values.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, target_id):
+        return self.search(target_id)[0]
+
+    def search(self, target_id):
+        """
+        Finds one ID.
+
+        Returns:
+            (True, index) with the ID's position in sorted order, or (False, -1).
+        """
+        if self.layout == "eytzinger":
+            return self._eytzinger_search(target_id)
+        values = self._values
+        if self.interpolation_error >= 0:
+            position = _interpolation_position(values, target_id, max(INTERPOLATION_WINDOW, 2 * self.interpolation_error))
+        else:
+            position = bisect_left(values, target_id)
+        if position < self.count and values[position] == target_id:
+            return True, position
+        return False, -1
+
+    def search_many(self, target_ids):
+        """Finds a batch of IDs; returns (found flags, indices) like search_many()."""
+        if self.layout == "eytzinger":
+            results = [self._eytzinger_search(target_id) for target_id in target_ids]
+            return [found for found, index in results], [index for found, index in results]
+        if numpy is not None:
+            return search_many(numpy.frombuffer(self._values, dtype=numpy.int64), target_ids) # No copy
+        return search_many(self._values, target_ids)
+
+    def _eytzinger_search(self, target_id):
+        """Branch-free descent of the breadth-first layout (slot 0 unused; node k has children 2k and 2k + 1)."""
+        values = self._values
+        n = self.count
+        k = 1
+        while k <= n:
+            k = 2 * k + (values[k] < target_id)
+        # The path went right every time it passed an ID below target_id; undoing the trailing
+        # right turns (and one left turn) lands on the first ID >= target_id, or 0 if there is none
+        k >>= ((~k) & (k + 1)).bit_length()
+        if k and values[k] == target_id:
+            return True, _eytzinger_rank(k, n)
+        return False, -1
+
+def _interpolation_error(values):
+    """
+    Returns how far (in positions) the position of a sample of sorted values strays from where
+    straight-line interpolation between the first and last value predicts it, or -1 if the values
+    are too uneven (or too few) for interpolation search to help.
+    """
+    n = len(values)
+    if n < UNIFORM_SAMPLES:
+        return -1
+    low, high = values[0], values[-1]
+    if high == low:
+        return -1
+    error = 0
+    for i in range(UNIFORM_SAMPLES + 1):
+        position = (n - 1) * i // UNIFORM_SAMPLES
+        predicted = (values[position] - low) * (n - 1) / (high - low)
+        error = max(error, abs(predicted - position))
+    return math.ceil(error) if error <= UNIFORM_TOLERANCE * n else -1
+
+def _interpolation_position(values, target_id, window):
+    """
+    Returns bisect_left(values, target_id) for evenly spaced values: guesses the position from
+    target_id's value, then binary-searches only the window around the guess. If the answer turns
+    out to lie outside the window (the sample used to size it missed an uneven stretch), the
+    rest of the list is searched, so the result is always correct.
+    """
+    n = len(values)
+    low_id, high_id = values[0], values[n - 1]
+    if target_id <= low_id:
+        return 0
+    if target_id > high_id:
+        return n
+    guess = int((target_id - low_id) * (n - 1) / (high_id - low_id))
+    low, high = max(0, guess - window), min(n, guess + window + 1)
+    position = bisect_left(values, target_id, low, high)
+    if position == low and low and values[low - 1] >= target_id:
+        return bisect_left(values, target_id, 0, low)
+    if position == high and high < n and values[high] < target_id:
+        return bisect_left(values, target_id, high, n)
+    return position
+
+def _to_eytzinger(sorted_values):
+    """Rearranges sorted values into breadth-first (Eytzinger) order, with an unused slot 0."""
+    n = len(sorted_values)
+    layout = array('q', bytes(8 * (n + 1)))
+    source = iter(sorted_values)
+    # An in-order walk of the implicit tree visits the slots in sorted order
+    stack = []
+    k = 1
+    while stack or k <= n:
+        while k <= n:
+            stack.append(k)
+            k *= 2
+        k = stack.pop()
+        layout[k] = next(source)
+        k = 2 * k + 1
+    return layout
+
+def _subtree_size(k, n):
+    """Number of slots in the subtree rooted at slot k of a breadth-first tree with n slots."""
+    if k > n:
+        return 0
+    levels = n.bit_length() - k.bit_length() # Levels below k, down to the (possibly partial) last one
+    full = (1 << levels) - 1 # Every level but the last is complete
+    first = k << levels
+    last = min(n, ((k + 1) << levels) - 1)
+    return full + max(0, last - first + 1)
+
+def _eytzinger_rank(k, n):
+    """Position in sorted order of the value in slot k of a breadth-first tree with n slots."""
+    rank = _subtree_size(2 * k, n) # Everything in k's left subtree is smaller
+    # Walking down from the root, every right turn passes a smaller node and its left subtree
+    for depth in range(k.bit_length() - 2, -1, -1):
+        parent = k >> (depth + 1)
+        if (k >> depth) & 1:
+            rank += _subtree_size(2 * parent, n) + 1
+    return rank
+
+# --- Dynamic Sorted ID Set ---
+
+class SortedIdSet:
+    """
+    A sorted set of IDs that stays sorted as IDs are added and removed, so enrollment changes
+    never require re-sorting the whole roster.
+
+    IDs are kept in a list of sorted blocks of about BLOCK_SIZE IDs each, plus a list of each
+    block's largest ID. A lookup binary-searches the list of maxima to find the block, then the
+    block itself, so it costs O(log n). Adding or removing an ID only shifts the IDs of one block.
+    Positions come from a Fenwick tree of block sizes, updated in O(log n) as IDs come and go,
+    so position queries also stay O(log n) between updates. Only when a block splits or merges
+    (at most once per BLOCK_SIZE / 2 changes to it) is the tree rebuilt, in O(n / BLOCK_SIZE).
+
+    Positions (as returned by search, lower_bound and upper_bound) are positions in sorted order,
+    like those of binary_search on the equivalent sorted list.
+    """
+    def __init__(self, ids=()):
+        ordered = sorted(set(ids))
+        self._blocks = [ordered[i:i + BLOCK_SIZE] for i in range(0, len(ordered), BLOCK_SIZE)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._sizes = None # Fenwick tree of block sizes, rebuilt only when blocks split or merge
+        self._count = len(ordered)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block
+
+    def __contains__(self, target_id):
+        block_index = bisect_left(self._maxes, target_id)
+        if block_index == len(self._maxes):
+            return False
+        block = self._blocks[block_index]
+        return block[bisect_left(block, target_id)] == target_id
+
+    def __getitem__(self, index):
+        """Returns the ID at a position in sorted order (negative positions count from the end)."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("SortedIdSet index out of range")
+        block_index, position = self._find_block(index)
+        return self._blocks[block_index][position]
+
+    def __repr__(self):
+        return f"SortedIdSet({list(self)})"
+
+    def add(self, target_id):
+        """Adds an ID. Returns False if it was already in the set."""
+        if not self._maxes:
+            self._blocks.append([target_id])
+            self._maxes.append(target_id)
+            self._sizes = None
+        else:
+            block_index = bisect_left(self._maxes, target_id)
+            if block_index == len(self._maxes):
+                block_index -= 1 # New largest ID: goes at the end of the last block
+                self._blocks[block_index].append(target_id)
+                self._maxes[block_index] = target_id
+            else:
+                block = self._blocks[block_index]
+                position = bisect_left(block, target_id)
+                if block[position] == target_id:
+                    return False
+                block.insert(position, target_id)
+            self._resize_block(block_index, 1)
+            if len(self._blocks[block_index]) > 2 * BLOCK_SIZE:
+                self._split(block_index)
+        self._count += 1
+        return True
+
+    def discard(self, target_id):
+        """Removes an ID if present. Returns False if it was not in the set."""
+        block_index = bisect_left(self._maxes, target_id)
+        if block_index == len(self._maxes):
+            return False
+        block = self._blocks[block_index]
+        position = bisect_left(block, target_id)
+        if block[position] != target_id:
+            return False
+        del block[position]
+        self._count -= 1
+        self._resize_block(block_index, -1)
+        if not block:
+            del self._blocks[block_index]
+            del self._maxes[block_index]
+            self._sizes = None
+        else:
+            self._maxes[block_index] = block[-1]
+            if len(block) < BLOCK_SIZE // 2 and len(self._blocks) > 1:
+                self._merge(block_index)
+        return True
+
+    def search(self, target_id):
+        """Finds an ID, keeping the binary_search contract: (True, index) or (False, -1)."""
+        position = self.lower_bound(target_id)
+        if position < self._count and self[position] == target_id:
+            return True, position
+        return False, -1
+
+    def lower_bound(self, target_id):
+        """Returns the position of the first ID >= target_id (len(self) if there is none)."""
+        block_index = bisect_left(self._maxes, target_id)
+        if block_index == len(self._maxes):
+            return self._count
+        return self._block_offset(block_index) + bisect_left(self._blocks[block_index], target_id)
+
+    def upper_bound(self, target_id):
+        """Returns the position of the first ID > target_id (len(self) if there is none)."""
+        block_index = bisect_right(self._maxes, target_id)
+        if block_index == len(self._maxes):
+            return self._count
+        return self._block_offset(block_index) + bisect_right(self._blocks[block_index], target_id)
+
+    def count_range(self, low_id, high_id):
+        """Returns how many IDs are between low_id and high_id, inclusive."""
+        return max(0, self.upper_bound(high_id) - self.lower_bound(low_id))
+
+    def irange(self, low_id, high_id):
+        """Yields the IDs between low_id and high_id, inclusive, in ascending order."""
+        block_index = bisect_left(self._maxes, low_id)
+        if block_index == len(self._maxes):
+            return
+        position = bisect_left(self._blocks[block_index], low_id)
+        for block in islice(self._blocks, block_index, None):
+            if block[-1] <= high_id:
+                yield from islice(block, position, None)
+            else:
+                yield from islice(block, position, bisect_right(block, high_id))
+                return
+            position = 0
+
+    def _block_sizes(self):
+        """Returns the Fenwick tree of block sizes (1-based), rebuilding it in O(n / BLOCK_SIZE) if blocks changed."""
+        if self._sizes is None:
+            sizes = [0]
+            sizes.extend(map(len, self._blocks))
+            for i in range(1, len(sizes)):
+                parent = i + (i & -i)
+                if parent < len(sizes):
+                    sizes[parent] += sizes[i]
+            self._sizes = sizes
+        return self._sizes
+
+    def _resize_block(self, block_index, change):
+        """Records that a block gained or lost IDs, in O(log n)."""
+        sizes = self._sizes
+        if sizes is None:
+            return # Rebuilt from the blocks when next needed
+        i = block_index + 1
+        while i < len(sizes):
+            sizes[i] += change
+            i += i & -i
+
+    def _block_offset(self, block_index):
+        """Returns the position of a block's first ID: the total size of the blocks before it."""
+        sizes = self._block_sizes()
+        total = 0
+        i = block_index
+        while i:
+            total += sizes[i]
+            i -= i & -i
+        return total
+
+    def _find_block(self, index):
+        """Returns (block index, position in that block) for a position in sorted order, by descending the Fenwick tree."""
+        sizes = self._block_sizes()
+        block_index = 0
+        step = 1 << (len(sizes) - 1).bit_length()
+        while step:
+            candidate = block_index + step
+            if candidate < len(sizes) and sizes[candidate] <= index:
+                block_index = candidate
+                index -= sizes[candidate]
+            step >>= 1
+        return block_index, index
+
+    def _split(self, block_index):
+        """Splits an oversized block in two."""
+        block = self._blocks[block_index]
+        half = block[BLOCK_SIZE:]
+        del block[BLOCK_SIZE:]
+        self._blocks.insert(block_index + 1, half)
+        self._maxes[block_index] = block[-1]
+        self._maxes.insert(block_index + 1, half[-1])
+        self._sizes = None
+
+    def _merge(self, block_index):
+        """Merges an undersized block into a neighbour, splitting the result again if it is too big."""
+        if block_index == len(self._blocks) - 1:
+            block_index -= 1 # The last block merges with the one before it
+        self._blocks[block_index].extend(self._blocks[block_index + 1])
+        del self._blocks[block_index + 1]
+        del self._maxes[block_index]
+        self._sizes = None
+        if len(self._blocks[block_index]) > 2 * BLOCK_SIZE:
+            self._split(block_index)
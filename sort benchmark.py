@@ -0,0 +1,281 @@
+import argparse
+import contextlib
+import csv
+import importlib.util
+import io
+import math
+import os
+import random
+import tempfile
+import time
+
+import sort_engine
+
+# --- Global Variables ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FILE = 'sort_benchmark_results.csv'
+DEFAULT_SIZES = [100, 300, 1000, 3000, 10000, 100000]
+QUADRATIC_LIMIT = 3000 # Largest input the O(n^2) teaching sorts are run on
+COUNT_LIMIT = 10000 # Largest input comparisons/writes are counted on (counting is slow)
+DISTRIBUTIONS = ["random", "sorted", "reversed", "few-unique", "nearly-sorted", "strings"]
+CAPITALS = ["Tokyo", "London", "Paris", "Berlin", "Rome", "Washington D.C.", "Madrid", "Ottawa", "Canberra",
+            "Nairobi", "Lima", "Oslo", "Seoul", "Cairo", "Dublin", "Lisbon", "Vienna", "Warsaw", "Athens", "Hanoi"]
+CSV_FIELDS = ["algorithm", "distribution", "size", "seconds", "comparisons", "swaps", "writes"]
+
+# --- Helper Functions ---
+
+def load_script(file_name):
+    """Imports one of the repository's scripts by file name (some have spaces), hiding anything it prints."""
+    spec = importlib.util.spec_from_file_location(os.path.splitext(file_name)[0].replace(' ', '_'),
+                                                  os.path.join(SCRIPT_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+def generate_data(distribution, size, seed):
+    """Builds an input list of the given size and distribution."""
+    rng = random.Random(seed)
+    if distribution == "strings":
+        # Capital names like my_capitals, made unique-ish with a district number
+        return [f"{rng.choice(CAPITALS)} {rng.randrange(size)}" for _ in range(size)]
+    if distribution == "few-unique":
+        return [rng.randint(0, 9) for _ in range(size)]
+    values = [rng.randint(0, size * 10) for _ in range(size)]
+    if distribution == "sorted":
+        values.sort()
+    elif distribution == "reversed":
+        values.sort(reverse=True)
+    elif distribution == "nearly-sorted":
+        values.sort()
+        for _ in range(max(1, size // 100)): # 1% of positions swapped with a random other
+            i, j = rng.randrange(size), rng.randrange(size)
+            values[i], values[j] = values[j], values[i]
+    return values
+
+class Counters:
+    """Running totals shared by all the Counted values and the CountingList of one run."""
+    def __init__(self):
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.native_sort = False # True if list.sort ran in C, where writes cannot be seen
+
+class Counted:
+    """Wraps a value and counts every comparison made with it."""
+    __slots__ = ('value', 'counters')
+
+    def __init__(self, value, counters):
+        self.value = value
+        self.counters = counters
+
+    def __lt__(self, other):
+        self.counters.comparisons += 1
+        return self.value < other.value
+
+    def __gt__(self, other):
+        self.counters.comparisons += 1
+        return self.value > other.value
+
+    def __le__(self, other):
+        self.counters.comparisons += 1
+        return self.value <= other.value
+
+    def __ge__(self, other):
+        self.counters.comparisons += 1
+        return self.value >= other.value
+
+    def __eq__(self, other):
+        self.counters.comparisons += 1
+        return self.value == other.value
+
+    __hash__ = None
+
+class CountingList(list):
+    """A list that counts element writes, and recognizes the a[i], a[j] = a[j], a[i] swap pattern."""
+    def __init__(self, values, counters):
+        super().__init__(values)
+        self.counters = counters
+        self.last_write = None
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.counters.writes += len(value)
+            self.last_write = None
+        else:
+            old = list.__getitem__(self, index)
+            self.counters.writes += 1
+            last = self.last_write
+            if last and last[0] != index and last[1] is value and last[2] is old:
+                self.counters.swaps += 1 # This write completes an exchange with the previous one
+                self.last_write = None
+            else:
+                self.last_write = (index, old, value)
+        super().__setitem__(index, value)
+
+    def sort(self, *args, **kwargs):
+        self.counters.native_sort = True
+        super().sort(*args, **kwargs)
+
+def fit_complexity(sizes, costs):
+    """
+    Fits cost = c * f(n) for f in 1, log n, n, n log n and n^2, and returns the best-fitting
+    model's name together with the log-log slope (the empirical exponent of n).
+    """
+    models = {
+        "O(1)": lambda n: 1,
+        "O(log n)": lambda n: math.log2(n),
+        "O(n)": lambda n: n,
+        "O(n log n)": lambda n: n * math.log2(n),
+        "O(n^2)": lambda n: n * n
+    }
+    best, best_error = None, None
+    for name, model in models.items():
+        # Least squares on relative error, so small and large sizes count equally
+        ratios = [cost / model(n) for n, cost in zip(sizes, costs)]
+        c = sum(ratios) / len(ratios)
+        error = sum((ratio / c - 1) ** 2 for ratio in ratios) if c else float("inf")
+        if best_error is None or error < best_error:
+            best, best_error = name, error
+
+    logs = [(math.log(n), math.log(cost)) for n, cost in zip(sizes, costs) if cost > 0]
+    slope = float("nan")
+    if len(logs) >= 2:
+        mean_x = sum(x for x, y in logs) / len(logs)
+        mean_y = sum(y for x, y in logs) / len(logs)
+        spread = sum((x - mean_x) ** 2 for x, y in logs)
+        if spread:
+            slope = sum((x - mean_x) * (y - mean_y) for x, y in logs) / spread
+    return best, slope
+
+# --- Benchmarks ---
+
+def build_algorithms():
+    """Returns {name: (sort function taking a list and returning it sorted, is_quadratic, can_count)}."""
+    bubble = load_script('Bubble_sort.py')
+    selection = load_script('Selection sort.py')
+    performance = load_script('Performance.py')
+
+    def in_place(function):
+        def run(values):
+            function(values)
+            return values
+        return run
+
+    def external(values):
+        # Numbers and strings are written one per line, sorted on disk in four runs, and read back
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(f"{value}\n" for value in values)
+            parse = sort_engine.parse_number if values and isinstance(values[0], int) else None
+            sort_engine.external_sort(path, path, parse=parse, chunk_size=max(1, len(values) // 4))
+            with open(path, 'r', encoding='utf-8') as f:
+                return [parse(line.rstrip('\n')) if parse else line.rstrip('\n') for line in f]
+
+    return {
+        "bubble_sort_classic": (in_place(bubble.bubble_sort_classic), True, True),
+        "selection_sort_classic": (in_place(selection.selection_sort_classic), True, True),
+        "Performance.selection_sort_classic": (performance.selection_sort_classic, True, True),
+        "bubble_sort (engine)": (in_place(bubble.bubble_sort), False, True),
+        "selection_sort (engine)": (in_place(selection.selection_sort), False, True),
+        "Performance.selection_sort (engine)": (performance.selection_sort, False, True),
+        "sorted_copy": (sort_engine.sorted_copy, False, True),
+        "parallel_sort": (in_place(sort_engine.parallel_sort), False, False),
+        "external_sort": (external, False, False)
+    }
+
+def time_sort(function, data, repeat):
+    """Returns the fastest of repeat runs of function on fresh copies of data, checking the result is sorted."""
+    expected = sorted(data)
+    best = float("inf")
+    for _ in range(repeat):
+        values = list(data)
+        start = time.perf_counter()
+        result = function(values)
+        best = min(best, time.perf_counter() - start)
+        if result != expected:
+            raise AssertionError("sort returned the wrong order")
+    return best
+
+def count_operations(function, data):
+    """Runs function once on instrumented data and returns (comparisons, swaps, writes); None means not observable."""
+    counters = Counters()
+    values = CountingList((Counted(value, counters) for value in data), counters)
+    function(values)
+    if counters.native_sort:
+        return counters.comparisons, None, None
+    return counters.comparisons, counters.swaps, counters.writes
+
+def run_benchmarks(sizes, distributions, repeat, seed, quadratic_limit, count_limit):
+    """Times (and where possible counts) every algorithm on every size and distribution."""
+    results = []
+    for name, (function, is_quadratic, can_count) in build_algorithms().items():
+        for distribution in distributions:
+            for size in sizes:
+                if is_quadratic and size > quadratic_limit:
+                    continue
+                data = generate_data(distribution, size, seed)
+                row = {"algorithm": name, "distribution": distribution, "size": size,
+                       "seconds": time_sort(function, data, repeat),
+                       "comparisons": None, "swaps": None, "writes": None}
+                if can_count and size <= count_limit:
+                    row["comparisons"], row["swaps"], row["writes"] = count_operations(function, data)
+                results.append(row)
+            print(f"Finished {name} on {distribution} data.")
+    return results
+
+# --- Reporting ---
+
+def print_table(results):
+    """Prints every result row."""
+    def show(value):
+        return "n/a" if value is None else str(value)
+    print(f"\n{'algorithm':<37} {'distribution':<14} {'size':>7} {'ms':>10} {'comparisons':>12} {'swaps':>10} {'writes':>10}")
+    for row in results:
+        print(f"{row['algorithm']:<37} {row['distribution']:<14} {row['size']:>7} {row['seconds'] * 1000:>10.3f} "
+              f"{show(row['comparisons']):>12} {show(row['swaps']):>10} {show(row['writes']):>10}")
+
+def print_complexity(results):
+    """Prints the fitted complexity of each algorithm on each distribution, from comparisons if counted, else time."""
+    print(f"\n{'algorithm':<37} {'distribution':<14} {'fitted on':<12} {'best fit':<11} {'exponent':>8}")
+    groups = {}
+    for row in results:
+        groups.setdefault((row["algorithm"], row["distribution"]), []).append(row)
+    for (name, distribution), rows in groups.items():
+        if len(rows) < 3:
+            continue # Too few sizes to tell the models apart
+        if all(row["comparisons"] for row in rows):
+            measure = "comparisons"
+        else:
+            measure = "seconds"
+        model, slope = fit_complexity([row["size"] for row in rows], [row[measure] for row in rows])
+        print(f"{name:<37} {distribution:<14} {measure:<12} {model:<11} {slope:>8.2f}")
+
+def save_csv(results, path):
+    """Writes the results to a CSV file."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"\nSaved {len(results)} results to {path}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark and instrument the sorting algorithms in this repository.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="input sizes to benchmark")
+    parser.add_argument("--distributions", nargs="+", default=DISTRIBUTIONS, choices=DISTRIBUTIONS,
+                        help="input distributions to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement (the fastest is kept)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, so inputs are reproducible")
+    parser.add_argument("--quadratic-limit", type=int, default=QUADRATIC_LIMIT,
+                        help="largest size the O(n^2) teaching sorts are run on")
+    parser.add_argument("--count-limit", type=int, default=COUNT_LIMIT,
+                        help="largest size comparisons, swaps and writes are counted on")
+    parser.add_argument("--csv", default=RESULTS_FILE, help="CSV file the results are written to")
+    args = parser.parse_args()
+
+    all_results = run_benchmarks(sorted(args.sizes), args.distributions, args.repeat, args.seed,
+                                 args.quadratic_limit, args.count_limit)
+    print_table(all_results)
+    print_complexity(all_results)
+    save_csv(all_results, args.csv)
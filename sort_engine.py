@@ -0,0 +1,505 @@
+"""
+Shared sorting engine used by Bubble_sort.py, Selection sort.py and Performance.py.
+
+The functions here keep the in-place call style of the original bubble_sort and
+selection_sort, but run in O(n log n) time instead of O(n^2). Integer data with few distinct
+values, such as exam scores from 0 to 100, is sorted by counting in O(n + k) time. Files too
+large to fit in memory can be sorted with external_sort, and very large sequences can be
+sorted on several CPU cores with parallel_sort.
+"""
+
+import argparse
+import bisect
+import copy
+import heapq
+import os
+import sys
+import tempfile
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from multiprocessing import shared_memory
+
+try:
+    import numpy
+except ImportError: # NumPy is optional; without it arrays are counted with Counter instead
+    numpy = None
+
+# --- Global Variables ---
+COUNTING_SORT_MIN_SIZE = 2000 # Below this, the built-in sort is faster than counting
+COUNTING_SORT_MAX_DISTINCT = 4096 # Most distinct values counting sort is used for
+COUNTING_SORT_MAX_RANGE = 1 << 16 # Widest value range (highest - lowest) NumPy counting sort is used for
+COUNTING_SORT_SAMPLE = 512 # Values checked up front to skip counting data that is mostly unique
+EXTERNAL_SORT_MEMORY = 256 * 1024 * 1024 # Default memory budget (bytes) for one in-memory run of external_sort
+EXTERNAL_SORT_MAX_OPEN_RUNS = 64 # Most run files merged at once; more runs are merged in several passes
+PARALLEL_SORT_MIN_SIZE = 1000000 # Below this, starting worker processes costs more than it saves
+NUMERIC_TYPECODES = 'bBhHiIlLqQfd' # array typecodes that can be sorted through shared memory
+
+def sort_in_place(items, key=None, reverse=False):
+    """
+    Sorts a mutable sequence in place in O(n log n) time, or O(n) if it is already in order.
+    Large runs of integers with few distinct values are counting-sorted in O(n + k) time.
+
+    Lists are sorted with Python's built-in Timsort, which is exactly the adaptive strategy we
+    want: it finds runs that are already ascending (or strictly descending, which it reverses),
+    extends short runs with binary insertion sort, and merges the runs with galloping. Because
+    it runs in C it is far faster than any sort we could write in Python.
+
+    The sort is stable: items that compare equal (or have equal keys) keep their original
+    order, including when reverse=True.
+
+    Args:
+        items: A list, or any other mutable sequence such as an array.array or NumPy array.
+        key: Optional function computing the value to compare for each item.
+        reverse: If True, sort in descending order.
+    """
+    if key is None and len(items) >= COUNTING_SORT_MIN_SIZE and counting_sort(items, reverse):
+        return
+
+    if numpy is not None and isinstance(items, numpy.ndarray) and key is None:
+        items.sort(kind='stable')
+        if reverse:
+            items[:] = items[::-1]
+        return
+
+    if isinstance(items, list):
+        items.sort(key=key, reverse=reverse)
+        return
+
+    if isinstance(items, array):
+        items[:] = array(items.typecode, sorted(items, key=key, reverse=reverse))
+        return
+
+    # Other mutable sequences are sorted as a list and copied back in place
+    for i, item in enumerate(sorted(items, key=key, reverse=reverse)):
+        items[i] = item
+
+def sorted_copy(items, key=None, reverse=False):
+    """
+    Returns a sorted copy of items, leaving items itself unchanged.
+
+    Lists, arrays and NumPy arrays are copied as the same type; any other iterable
+    (a tuple, a generator, a dict's values...) is returned as a sorted list.
+    """
+    if isinstance(items, (list, array)) or (numpy is not None and isinstance(items, numpy.ndarray)):
+        result = copy.copy(items)
+    else:
+        result = list(items)
+    sort_in_place(result, key=key, reverse=reverse)
+    return result
+
+def counting_sort(items, reverse=False):
+    """
+    Sorts a sequence of plain integers in place by counting how often each value occurs,
+    in O(n + k) time for n items and k distinct values.
+
+    Returns False, leaving items untouched, if they are not all integers or have too many
+    distinct values for counting to beat a comparison sort; the caller then sorts normally.
+    """
+    if numpy is not None and isinstance(items, (array, numpy.ndarray)):
+        return _numpy_counting_sort(items, reverse)
+
+    # Counter merges equal values, so a True, 5.0 or IntEnum member would come back as a plain int.
+    # Every item is checked (in C) before counting, since only the first of equal keys survives in counts.
+    if set(map(type, items)) != {int}:
+        return False
+
+    # Mostly-unique data (IDs, timestamps...) would only build a huge Counter, so check a sample first
+    sample = items[:COUNTING_SORT_SAMPLE]
+    if len(set(sample)) > len(sample) // 2:
+        return False
+
+    counts = Counter(items) # Counts in C, much faster than a Python loop
+    if len(counts) > COUNTING_SORT_MAX_DISTINCT:
+        return False # Too many values for counting to pay off
+
+    result = []
+    for value in sorted(counts, reverse=reverse):
+        result.extend(repeat(value, counts[value]))
+    if isinstance(items, array):
+        items[:] = array(items.typecode, result)
+    else:
+        items[:] = result
+    return True
+
+def _numpy_counting_sort(items, reverse):
+    """Counting sort of an integer array or NumPy array, done by NumPy directly on its buffer."""
+    if isinstance(items, array):
+        if items.typecode not in 'bBhHiIlLqQ':
+            return False
+        values = numpy.frombuffer(items, dtype=items.typecode) # Shares memory with items, no copy
+    else:
+        if items.dtype.kind not in 'iu':
+            return False
+        values = items
+
+    lowest = values.min()
+    # Offsets from the lowest value, read as unsigned so that e.g. int8 values -100..100 don't overflow
+    offsets = (values - lowest).view(f'u{values.itemsize}')
+    value_range = int(offsets.max())
+    if value_range > COUNTING_SORT_MAX_RANGE:
+        return False
+
+    counts = numpy.bincount(offsets.astype(numpy.intp), minlength=value_range + 1)
+    ordered = numpy.repeat(numpy.arange(value_range + 1).astype(values.dtype) + lowest, counts)
+    values[:] = ordered[::-1] if reverse else ordered
+    return True
+
+# --- Parallel Sorting ---
+
+def parallel_sort(items, key=None, reverse=False, workers=None, min_size=PARALLEL_SORT_MIN_SIZE):
+    """
+    Sorts a mutable sequence in place using several worker processes. Stable, like sort_in_place.
+
+    Uses parallel sorting by regular sampling: each worker sorts one chunk of the input, a few
+    evenly spaced values from every sorted chunk are used to pick splitters, and each worker
+    then merges the part of every chunk that falls between two splitters. Both the sorting and
+    the merging are spread across the workers, and the merged parts are simply placed one after
+    another.
+
+    Numeric data (array.array, NumPy arrays, and lists of only ints or only floats) is passed to
+    the workers through shared memory instead of being pickled. Other data, and any key function,
+    must be picklable (e.g. key must be a module-level function, not a lambda).
+
+    Inputs shorter than min_size, or a single worker, are sorted in this process with sort_in_place.
+    On Windows and macOS, where workers start as fresh interpreters, call this from code under
+    if __name__ == "__main__":.
+
+    Args:
+        items: A list, array.array or NumPy array.
+        key: Optional function computing the value to compare for each item.
+        reverse: If True, sort in descending order.
+        workers: Number of worker processes (defaults to the number of CPUs).
+        min_size: Smallest input that is worth sorting in parallel.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(items) < max(min_size, workers * workers):
+        sort_in_place(items, key=key, reverse=reverse)
+        return
+
+    # A stable descending sort is the reverse of a stable ascending sort of the reversed input
+    if reverse:
+        _reverse(items)
+
+    try:
+        values = _numeric_array(items) if key is None else None
+        if values is not None:
+            _parallel_sort_shared(values, workers)
+            if values is not items:
+                items[:] = values.tolist()
+        else:
+            _parallel_sort_pickled(items, key, workers)
+    finally:
+        if reverse:
+            _reverse(items) # If a worker failed, items is still unsorted and this restores its order
+
+def _reverse(items):
+    """Reverses a list, array.array or NumPy array in place."""
+    if numpy is not None and isinstance(items, numpy.ndarray):
+        items[:] = items[::-1]
+    else:
+        items.reverse()
+
+def _numeric_array(items):
+    """Returns items as a numeric array.array or NumPy array if it is one or can be converted to one, else None."""
+    if isinstance(items, array):
+        return items if items.typecode in NUMERIC_TYPECODES else None
+    if numpy is not None and isinstance(items, numpy.ndarray):
+        return items if items.dtype.char in NUMERIC_TYPECODES and items.ndim == 1 and items.flags.c_contiguous else None
+    if isinstance(items, list):
+        types = set(map(type, items))
+        try:
+            if types == {int}:
+                return array('q', items)
+            if types == {float}:
+                return array('d', items)
+        except OverflowError:
+            pass # Integers too big for 64 bits are sorted as ordinary objects
+    return None
+
+def _chunk_bounds(length, parts):
+    """Splits range(length) into parts nearly equal (start, end) pairs."""
+    return [(length * i // parts, length * (i + 1) // parts) for i in range(parts)]
+
+def _segment_bounds(chunks, key, parts):
+    """
+    Picks parts - 1 splitters from evenly spaced samples of the sorted chunks and returns, for each
+    chunk, the positions where its segments start and end. Segment j of every chunk holds the
+    values between splitters j - 1 and j, so merging segment j of all chunks gives part j of the output.
+    """
+    samples = []
+    for chunk in chunks:
+        for i in range(parts):
+            value = chunk[len(chunk) * i // parts]
+            samples.append(key(value) if key is not None else value)
+    samples.sort()
+    splitters = [samples[parts * i + parts // 2] for i in range(1, parts)]
+    # bisect_right for every splitter, so equal values always land in the same segment
+    return [[0] + [bisect.bisect_right(chunk, splitter, key=key) for splitter in splitters] + [len(chunk)]
+            for chunk in chunks]
+
+def _parallel_sort_pickled(items, key, workers):
+    """Parallel sort of general objects, which are pickled to and from the worker processes."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = [items[start:end] for start, end in _chunk_bounds(len(items), workers)]
+        chunks = list(executor.map(_sort_chunk, chunks, repeat(key)))
+        bounds = _segment_bounds(chunks, key, workers)
+        pieces = [[chunk[b[j]:b[j + 1]] for chunk, b in zip(chunks, bounds)] for j in range(workers)]
+        del chunks
+        items[:] = list(chain.from_iterable(executor.map(_merge_pieces, pieces, repeat(key))))
+
+def _sort_chunk(chunk, key):
+    """Worker: sorts one chunk of a pickled input."""
+    sort_in_place(chunk, key=key)
+    return chunk
+
+def _merge_pieces(pieces, key):
+    """
+    Worker: merges already-sorted pieces. Timsort finds each piece as a run and merges them in C,
+    which is much faster than heapq.merge, and keeps equal items in piece order, so this is stable.
+    """
+    merged = list(chain.from_iterable(pieces))
+    merged.sort(key=key)
+    return merged
+
+def _parallel_sort_shared(values, workers):
+    """Parallel sort of a numeric array, shared with the worker processes instead of being copied to them."""
+    typecode = values.dtype.char if not isinstance(values, array) else values.typecode
+    nbytes = len(values) * values.itemsize
+    source = shared_memory.SharedMemory(create=True, size=nbytes)
+    target = shared_memory.SharedMemory(create=True, size=nbytes)
+    source_view = chunks = None
+    try:
+        source_view = source.buf[:nbytes].cast('B').cast(typecode)
+        source_view[:] = memoryview(values).cast('B').cast(typecode)
+        chunk_bounds = _chunk_bounds(len(values), workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_sort_shared_chunk, repeat(source.name), repeat(typecode), chunk_bounds))
+            chunks = [source_view[start:end] for start, end in chunk_bounds]
+            bounds = _segment_bounds(chunks, None, workers)
+            merges = []
+            offset = 0
+            for j in range(workers):
+                segments = [(start + b[j], start + b[j + 1]) for (start, end), b in zip(chunk_bounds, bounds)]
+                merges.append(executor.submit(_merge_shared_segments, source.name, target.name, typecode, segments, offset))
+                offset += sum(end - start for start, end in segments)
+            for merge in merges:
+                merge.result()
+        memoryview(values).cast('B')[:] = target.buf[:nbytes]
+    finally:
+        source_view = chunks = None # Views must be released before the shared memory can be closed
+        for block in (source, target):
+            block.close()
+            block.unlink()
+
+def _shared_values(block, typecode, count):
+    """Returns a view of the first count values of a shared memory block, as a NumPy array if possible."""
+    if numpy is not None:
+        return numpy.ndarray((count,), dtype=typecode, buffer=block.buf)
+    return block.buf.cast('B')[:count * array(typecode).itemsize].cast(typecode)
+
+def _sort_shared_chunk(name, typecode, bounds):
+    """Worker: sorts values[start:end] of a shared numeric array in place."""
+    start, end = bounds
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        values = _shared_values(block, typecode, end)
+        if numpy is not None:
+            sort_in_place(values[start:end])
+        else:
+            chunk = array(typecode, values[start:end].tobytes())
+            sort_in_place(chunk)
+            values[start:end] = chunk
+        del values
+    finally:
+        block.close()
+
+def _merge_shared_segments(source_name, target_name, typecode, segments, offset):
+    """Worker: merges sorted segments of the shared source array into the target array at offset."""
+    source = shared_memory.SharedMemory(name=source_name)
+    target = shared_memory.SharedMemory(name=target_name)
+    try:
+        count = sum(end - start for start, end in segments)
+        values = _shared_values(source, typecode, max([end for start, end in segments] + [0]))
+        output = _shared_values(target, typecode, offset + count)
+        # Both sorts find the sorted segments as runs and merge them
+        if numpy is not None:
+            merged = numpy.concatenate([values[start:end] for start, end in segments])
+            merged.sort(kind='stable')
+        else:
+            merged = array(typecode, sorted(chain.from_iterable(values[start:end] for start, end in segments)))
+        output[offset:offset + count] = merged
+        del values, output
+    finally:
+        source.close()
+        target.close()
+
+# --- External Sorting ---
+
+def parse_number(text):
+    """Parses a line as an int if possible, otherwise as a float (for sorting numeric files)."""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def external_sort(input_path, output_path, parse=None, key=None, reverse=False,
+                  memory_limit=EXTERNAL_SORT_MEMORY, chunk_size=None, temp_dir=None,
+                  max_open_runs=EXTERNAL_SORT_MAX_OPEN_RUNS, progress=None):
+    """
+    Sorts the lines of a text file that may be far larger than memory, writing them to output_path.
+
+    The input is read in chunks that fit within memory_limit (and chunk_size lines, if given).
+    Each chunk is sorted in memory and written to a temporary "run" file, then the runs are
+    merged with a heap, reading one line at a time from each. A file that fits in a single
+    chunk is sorted directly without any temporary files.
+
+    Lines are written out exactly as they were read; only the order changes. Like sort_in_place,
+    the sort is stable: lines with equal keys keep their original order.
+
+    Args:
+        input_path: File to sort, one record per line (UTF-8).
+        output_path: File the sorted lines are written to. May be the same as input_path.
+        parse: Optional function turning a line (without its newline) into the record to sort by,
+               e.g. parse_number for a file of scores. Defaults to the line itself.
+        key: Optional function computing the value to compare for each parsed record.
+        reverse: If True, sort in descending order.
+        memory_limit: Approximate bytes of lines (and their keys) held in memory per run.
+        chunk_size: Optional maximum number of lines per run.
+        temp_dir: Directory for the run files (defaults to the system temp directory).
+        max_open_runs: Most run files open at once while merging.
+        progress: Optional function called as progress(stage, done, total) while sorting,
+                  where stage is "reading" (bytes) or "merging" (lines).
+
+    Returns:
+        The number of lines sorted.
+
+    Raises:
+        ValueError: If memory_limit is not positive, chunk_size is below 1 or max_open_runs is below 2.
+    """
+    if memory_limit <= 0:
+        raise ValueError(f"memory_limit must be positive, not {memory_limit}")
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, not {chunk_size}")
+    if max_open_runs < 2:
+        raise ValueError(f"max_open_runs must be at least 2, not {max_open_runs}")
+
+    def sort_key(line):
+        record = line.rstrip('\n')
+        if parse is not None:
+            record = parse(record)
+        return key(record) if key is not None else record
+
+    total_bytes = os.path.getsize(input_path)
+    line_count = 0
+    with tempfile.TemporaryDirectory(dir=temp_dir) as run_dir:
+        run_paths = []
+        with open(input_path, 'r', encoding='utf-8') as source:
+            for chunk, is_last in _read_chunks(source, memory_limit, chunk_size):
+                line_count += len(chunk)
+                sort_in_place(chunk, key=sort_key, reverse=reverse)
+                if is_last and not run_paths:
+                    # Everything fit in one chunk, so there is nothing to merge
+                    _write_lines(output_path, chunk)
+                    if progress:
+                        progress("reading", total_bytes, total_bytes)
+                        progress("merging", line_count, line_count)
+                    return line_count
+                run_paths.append(os.path.join(run_dir, f"run{len(run_paths)}.txt"))
+                _write_lines(run_paths[-1], chunk)
+                if progress:
+                    progress("reading", total_bytes if is_last else min(source.buffer.tell(), total_bytes), total_bytes)
+
+        if not run_paths:
+            _write_lines(output_path, []) # Empty input
+            return 0
+
+        # Merge groups of runs into bigger runs until they can all be merged in one pass
+        merged = 0
+        while len(run_paths) > max_open_runs:
+            merged_paths = []
+            for start in range(0, len(run_paths), max_open_runs):
+                merged_paths.append(os.path.join(run_dir, f"merge{merged}.txt"))
+                merged += 1
+                _merge_runs(run_paths[start:start + max_open_runs], merged_paths[-1], sort_key, reverse)
+            run_paths = merged_paths
+        _merge_runs(run_paths, output_path, sort_key, reverse,
+                    (lambda done: progress("merging", done, line_count)) if progress else None)
+    return line_count
+
+def _read_chunks(source, memory_limit, chunk_size):
+    """
+    Yields (lines, is_last) for consecutive chunks of source, each using about memory_limit
+    bytes at most. Every chunk holds at least one line, however long it is.
+    """
+    line = source.readline()
+    while line:
+        chunk = []
+        used = 0
+        while line and (not chunk or (used < memory_limit and len(chunk) != chunk_size)):
+            if not line.endswith('\n'):
+                line += '\n' # The last line of a file may have no newline; runs need one on every line
+            chunk.append(line)
+            used += sys.getsizeof(line) + 64 # Plus the list slot and (roughly) the line's parsed key
+            line = source.readline()
+        yield chunk, not line
+
+def _write_lines(path, lines):
+    """Writes lines to path, replacing the file only once it is complete."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    os.replace(temp_path, path)
+
+def _merge_runs(run_paths, output_path, sort_key, reverse, report=None):
+    """K-way merges sorted run files into output_path using a heap (heapq.merge)."""
+    runs = [open(path, 'r', encoding='utf-8') for path in run_paths]
+    try:
+        temp_path = output_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as out:
+            # heapq.merge takes equal keys from earlier runs first, so the merge stays stable
+            for done, line in enumerate(heapq.merge(*runs, key=sort_key, reverse=reverse), 1):
+                out.write(line)
+                if report and done % 100000 == 0:
+                    report(done)
+        os.replace(temp_path, output_path)
+        if report and done % 100000:
+            report(done)
+    finally:
+        for run in runs:
+            run.close()
+
+def print_progress(stage, done, total):
+    """Prints external_sort progress on a single updating line."""
+    percent = done / total * 100 if total else 100
+    end = "\n" if done >= total else ""
+    print(f"\r{stage.capitalize()}: {percent:5.1f}%", end=end, flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sort the lines of a text file too large to fit in memory.")
+    parser.add_argument("input", help="file to sort, one record per line")
+    parser.add_argument("output", help="file to write the sorted lines to")
+    parser.add_argument("--numeric", action="store_true", help="sort lines as numbers instead of text")
+    parser.add_argument("--field", type=int, default=None, help="sort by this (0-based) field of each line")
+    parser.add_argument("--delimiter", default=",", help="field separator used with --field")
+    parser.add_argument("--reverse", action="store_true", help="sort in descending order")
+    parser.add_argument("--memory-mb", type=float, default=EXTERNAL_SORT_MEMORY / (1024 * 1024),
+                        help="memory budget for each in-memory run")
+    parser.add_argument("--chunk-lines", type=int, default=None, help="maximum lines per in-memory run")
+    parser.add_argument("--temp-dir", default=None, help="directory for temporary run files")
+    args = parser.parse_args()
+
+    def parse_line(line):
+        if args.field is not None:
+            line = line.split(args.delimiter)[args.field]
+        return parse_number(line) if args.numeric else line
+
+    try:
+        count = external_sort(args.input, args.output, parse=parse_line, reverse=args.reverse,
+                              memory_limit=int(args.memory_mb * 1024 * 1024), chunk_size=args.chunk_lines,
+                              temp_dir=args.temp_dir, progress=print_progress)
+        print(f"Sorted {count} lines into {args.output}.")
+    except (OSError, ValueError, IndexError) as e:
+        print(f"Error sorting {args.input}: {e}")
+        sys.exit(1)
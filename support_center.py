@@ -0,0 +1,278 @@
+"""
+Asyncio runtime for the customer support queue: a pool of agents working through a
+SupportQueue or TieredSupportQueue concurrently, on a single thread.
+
+Run it directly to simulate a busy support center and measure how an agent pool copes:
+
+    python support_center.py --agents 8 --customers 5000 --arrival-rate 2 --handling-time 3
+"""
+
+import argparse
+import asyncio
+import random
+import selectors
+import time
+
+from support_queue import SupportQueue, TieredSupportQueue
+
+# --- Global Variables ---
+DEFAULT_AGENTS = 4
+DEFAULT_HANDLING_TIME = 3.0 # Mean seconds an agent spends on one inquiry in the simulation
+
+class SupportCenter:
+    """
+    Runs a pool of agents, each a coroutine that takes customers from a queue and handles them.
+
+    Customers are handled by an async handler(agent_name, customer_id). The default handler
+    simulates the work by sleeping for a random (exponentially distributed) handling time.
+    A real one could call a ticketing system, a chatbot, and so on.
+
+    Times are in simulated seconds, read from the event loop's clock: with time_scale=100, one
+    simulated second passes in 10 ms of real time. Use time_scale=1 for real time. Overhead in the
+    event loop is multiplied by time_scale too, so for accurate simulations run the center on a
+    VirtualTimeLoop instead, where waiting takes no real time and only the sleeps count.
+    """
+    def __init__(self, queue=None, agents=DEFAULT_AGENTS, handler=None,
+                 handling_time=DEFAULT_HANDLING_TIME, time_scale=1.0, seed=None):
+        self.queue = queue if queue is not None else SupportQueue()
+        if isinstance(self.queue, TieredSupportQueue):
+            self.queue.clock = self.clock # Aging deadlines must use the same (scaled) time as the center
+        self.agent_count = agents
+        self.handler = handler or self.simulated_handler
+        self.handling_time = handling_time
+        self.time_scale = time_scale
+        self.random = random.Random(seed)
+        self._lock = asyncio.Lock()
+        self._work = asyncio.Condition(self._lock) # Agents wait here for customers
+        self._space = asyncio.Condition(self._lock) # Producers wait here for room in a full queue
+        self._closing = False
+        self._agents = []
+        # Metrics
+        self._submitted_at = {} # customer_id -> time they joined the queue
+        self.waits = [] # Seconds each processed customer waited in the queue
+        self.handled_by = {} # agent name -> customers handled
+        self.busy_time = {} # agent name -> seconds spent handling
+        self.failed = [] # (customer_id, error) for inquiries whose handler raised
+        self.interrupted = [] # Customers whose handling was cancelled by a non-draining shutdown
+        self.started_at = None
+        self.stopped_at = None
+
+    def clock(self):
+        """Current simulated time in seconds."""
+        try:
+            now = asyncio.get_running_loop().time()
+        except RuntimeError: # Called from outside the event loop
+            now = time.monotonic()
+        return now * self.time_scale
+
+    async def sleep(self, seconds):
+        """Sleeps for a number of simulated seconds."""
+        await asyncio.sleep(seconds / self.time_scale)
+
+    async def simulated_handler(self, agent_name, customer_id):
+        """Default handler: takes a random handling time averaging handling_time seconds."""
+        await self.sleep(self.random.expovariate(1 / self.handling_time))
+
+    def start(self):
+        """Starts the agents. Must be called from inside a running event loop."""
+        self.started_at = self.clock()
+        for i in range(self.agent_count):
+            name = f"Agent {i + 1}"
+            self.handled_by[name] = 0
+            self.busy_time[name] = 0.0
+            self._agents.append(asyncio.create_task(self._agent(name), name=name))
+
+    async def submit(self, customer_id, tier=None):
+        """
+        Adds a customer to the queue. If the queue is bounded and full, waits until an agent
+        frees a place (backpressure) instead of rejecting the customer.
+
+        Raises:
+            RuntimeError: If the center is shutting down.
+        """
+        async with self._lock:
+            if getattr(self.queue, "capacity", None) is not None:
+                await self._space.wait_for(lambda: self._closing or not self.queue.is_full())
+            if self._closing:
+                raise RuntimeError("The support center is closing and not taking new inquiries.")
+            if tier is None:
+                self.queue.enqueue(customer_id)
+            else:
+                self.queue.enqueue(customer_id, tier=tier)
+            self._submitted_at[customer_id] = self.clock()
+            self._work.notify()
+
+    async def shutdown(self, drain=True):
+        """
+        Stops the center. New submissions are refused straight away.
+
+        With drain=True, agents first finish every customer already in the queue. With
+        drain=False, agents stop at once: inquiries being handled are cancelled (and recorded
+        in interrupted), and customers still waiting are removed from the queue, in the order
+        they would have been served, so they can be handed on elsewhere.
+
+        Returns:
+            The customers that were not handled: interrupted ones first, then those that were
+            still waiting. The queue is left empty.
+        """
+        async with self._lock:
+            self._closing = True
+            self._work.notify_all()
+            self._space.notify_all()
+        if not drain:
+            for agent in self._agents:
+                agent.cancel()
+        await asyncio.gather(*self._agents, return_exceptions=True)
+        self.stopped_at = self.clock()
+        unhandled = list(self.interrupted)
+        while self.queue:
+            unhandled.append(self.queue.dequeue())
+        return unhandled
+
+    async def _agent(self, name):
+        """One agent: repeatedly takes the next customer and handles them, until the center closes."""
+        while True:
+            async with self._lock:
+                await self._work.wait_for(lambda: self._closing or self.queue)
+                if not self.queue:
+                    return # Closing, and nobody left to serve
+                customer_id = self.queue.dequeue()
+                self._space.notify()
+            now = self.clock()
+            self.waits.append(now - self._submitted_at.pop(customer_id, now))
+            try:
+                await self.handler(name, customer_id)
+                self.handled_by[name] += 1
+            except asyncio.CancelledError:
+                self.interrupted.append(customer_id)
+                raise
+            except Exception as e: # A failing inquiry must not take the agent down with it
+                self.failed.append((customer_id, e))
+            finally:
+                self.busy_time[name] += self.clock() - now
+
+    def report(self):
+        """Returns a dict of throughput, queue wait and agent utilization figures."""
+        elapsed = (self.stopped_at or self.clock()) - self.started_at
+        waits = sorted(self.waits)
+        handled = sum(self.handled_by.values())
+
+        def percentile(fraction):
+            return waits[min(len(waits) - 1, int(fraction * len(waits)))] if waits else 0.0
+
+        return {
+            "agents": self.agent_count,
+            "handled": handled,
+            "failed": len(self.failed),
+            "interrupted": len(self.interrupted),
+            "elapsed_seconds": elapsed,
+            "throughput_per_hour": handled / elapsed * 3600 if elapsed else 0.0,
+            "wait_mean": sum(waits) / len(waits) if waits else 0.0,
+            "wait_p50": percentile(0.50),
+            "wait_p95": percentile(0.95),
+            "wait_p99": percentile(0.99),
+            "wait_max": waits[-1] if waits else 0.0,
+            "utilization": sum(self.busy_time.values()) / (elapsed * self.agent_count) if elapsed else 0.0
+        }
+
+# --- Simulation ---
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop with a simulated clock. Whenever every coroutine is waiting on a timer, the
+    clock jumps straight to the next one instead of sleeping, so a simulation runs as fast as
+    the CPU allows and its timings do not depend on how fast the machine is.
+
+    Only for code that waits on nothing but timers: a coroutine waiting on real I/O would see
+    its timeouts expire at once.
+    """
+    def __init__(self):
+        self._virtual_time = 0.0
+        super().__init__(_VirtualTimeSelector(self))
+
+    def time(self):
+        return self._virtual_time
+
+class _VirtualTimeSelector(selectors.DefaultSelector):
+    """Selector that advances its VirtualTimeLoop's clock by the timeout instead of blocking."""
+    def __init__(self, loop):
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout=None):
+        if timeout is not None and timeout > 0:
+            self._loop._virtual_time += timeout # Nothing can happen before the next timer is due
+            timeout = 0
+        return super().select(timeout)
+
+async def produce(center, customers, arrival_rate, tiers=None, first=1):
+    """
+    Submits customers (numbered from first) to the center with random (Poisson) arrivals
+    averaging arrival_rate per simulated second. If tiers is given, each customer's tier is
+    picked from it at random.
+    """
+    for i in range(first, first + customers):
+        tier = center.random.choice(tiers) if tiers else None
+        await center.submit(f"Customer {i}", tier=tier)
+        await center.sleep(center.random.expovariate(arrival_rate))
+
+async def simulate(agents, customers, arrival_rate, handling_time, time_scale, producers=1,
+                   capacity=None, tiered=False, seed=None):
+    """Runs one simulation to completion and returns the center's report."""
+    if tiered and capacity is not None:
+        raise ValueError("A tiered queue has no capacity limit; leave capacity unset.")
+    queue = TieredSupportQueue() if tiered else SupportQueue(capacity=capacity)
+    center = SupportCenter(queue, agents, handling_time=handling_time, time_scale=time_scale, seed=seed)
+    center.start()
+    # Several producers share the arrival rate, like several channels (phone, chat, email...)
+    shares = [customers // producers + (i < customers % producers) for i in range(producers)]
+    tiers = list(queue.tiers) if tiered else None
+    firsts = [1 + sum(shares[:i]) for i in range(producers)]
+    await asyncio.gather(*(produce(center, share, arrival_rate / producers, tiers, first)
+                           for share, first in zip(shares, firsts)))
+    await center.shutdown(drain=True)
+    return center.report()
+
+def print_report(report):
+    """Prints a simulation report."""
+    print(f"\n--- Support Center Report ({report['agents']} agents) ---")
+    print(f"Inquiries handled: {report['handled']} (failed: {report['failed']}, interrupted: {report['interrupted']})")
+    print(f"Simulated time: {report['elapsed_seconds']:.0f} s")
+    print(f"Throughput: {report['throughput_per_hour']:.0f} inquiries per hour")
+    print(f"Queue wait: mean {report['wait_mean']:.1f} s, p50 {report['wait_p50']:.1f} s, "
+          f"p95 {report['wait_p95']:.1f} s, p99 {report['wait_p99']:.1f} s, max {report['wait_max']:.1f} s")
+    print(f"Agent utilization: {report['utilization']:.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a pool of support agents working through the customer queue.")
+    parser.add_argument("--agents", type=int, nargs="+", default=[DEFAULT_AGENTS],
+                        help="agent pool size(s) to simulate, e.g. --agents 4 8 16 to compare")
+    parser.add_argument("--customers", type=int, default=1000, help="number of inquiries to submit")
+    parser.add_argument("--arrival-rate", type=float, default=1.0, help="mean inquiries arriving per second")
+    parser.add_argument("--handling-time", type=float, default=DEFAULT_HANDLING_TIME, help="mean seconds to handle an inquiry")
+    parser.add_argument("--producers", type=int, default=1, help="concurrent producers submitting inquiries")
+    parser.add_argument("--capacity", type=int, default=None, help="bound the FIFO queue (producers then wait for room)")
+    parser.add_argument("--tiered", action="store_true", help="use VIP/SLA/Standard tiers instead of one FIFO queue")
+    parser.add_argument("--real-time", action="store_true",
+                        help="run on the real clock (sped up by --time-scale) instead of a simulated one")
+    parser.add_argument("--time-scale", type=float, default=100.0,
+                        help="simulated seconds per real second with --real-time (large scales also magnify "
+                             "event-loop overhead, making waits look longer than they are)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed, so runs are reproducible")
+    args = parser.parse_args()
+    if args.tiered and args.capacity is not None:
+        parser.error("--capacity cannot be used with --tiered")
+
+    for agent_count in args.agents:
+        loop = asyncio.new_event_loop() if args.real_time else VirtualTimeLoop()
+        try:
+            result = loop.run_until_complete(
+                simulate(agent_count, args.customers, args.arrival_rate, args.handling_time,
+                         args.time_scale if args.real_time else 1.0, args.producers, args.capacity,
+                         args.tiered, args.seed))
+        except KeyboardInterrupt:
+            print("\nSimulation stopped.")
+            break
+        finally:
+            loop.close()
+        print_report(result)
@@ -0,0 +1,671 @@
+"""
+Queue types for the customer support simulation in Queue.py.
+
+SupportQueue is a first-in, first-out queue with O(1) enqueue and dequeue (a Python list's
+pop(0) is O(n), because every remaining customer has to move up one place).
+TieredSupportQueue serves several tiers of customers (VIP, SLA-bound, standard) fairly.
+DurableSupportQueue keeps its customers on disk, so they survive a restart or crash.
+"""
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from itertools import islice
+
+# --- Global Variables ---
+OVERFLOW_POLICIES = ("reject", "block", "drop_oldest")
+DISPLAY_EDGE = 3 # Customers shown at each end of a long queue; the middle is summarized
+# Each tier's share of agents' time (weight) and the longest a customer should wait (in seconds)
+# before being served ahead of everyone who hasn't waited that long for their own tier
+DEFAULT_TIERS = {
+    "VIP": {"weight": 4, "max_wait": 60},
+    "SLA": {"weight": 2, "max_wait": 300},
+    "Standard": {"weight": 1, "max_wait": 1800}
+}
+DEFAULT_TIER = "Standard"
+SYNC_MODES = ("always", "batch", "none")
+SEGMENT_BYTES = 64 * 1024 * 1024 # A segment file is closed, and a new one started, once it reaches this size
+SYNC_BATCH = 1000 # In "batch" mode, operations written before the log is flushed to disk...
+SYNC_INTERVAL = 0.05 # ...or seconds after the first unflushed operation, whichever comes first
+RECORD_HEADER = struct.Struct('<BIIQ') # type, payload length, CRC-32, sequence number
+RECORD_ENQUEUE = 1
+RECORD_ACK = 2
+CONSUMER_OFFSET = struct.Struct('<QQQ') # segment, byte offset and sequence number of the oldest unacknowledged customer
+
+class QueueFull(Exception):
+    """Raised when a customer cannot be added because a bounded queue is full."""
+
+class SupportQueue:
+    """
+    A FIFO queue of customers, backed by collections.deque, so adding at the back and
+    removing from the front are both O(1).
+
+    The queue can be given a capacity. What happens when a customer arrives at a full queue
+    depends on the overflow policy:
+      - "reject": enqueue raises QueueFull (the caller can tell the customer to try later).
+      - "block": enqueue waits until an agent frees a place (backpressure for producer threads),
+        raising QueueFull only if a timeout runs out first.
+      - "drop_oldest": the customer who has waited longest is dropped to make room.
+    """
+    def __init__(self, customers=(), capacity=None, overflow="reject"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, not {overflow!r}")
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.overflow = overflow
+        self.dropped = 0 # Customers dropped by the "drop_oldest" policy
+        self._customers = deque()
+        self._changed = threading.Condition() # Lets "block" wait for room, and guards the deque while it does
+        self.enqueue_many(customers)
+
+    def __len__(self):
+        return len(self._customers)
+
+    def __bool__(self):
+        return bool(self._customers)
+
+    def __iter__(self):
+        return iter(self._customers)
+
+    def __str__(self):
+        return self.summary()
+
+    def __repr__(self):
+        return f"SupportQueue({self.summary()})"
+
+    def is_full(self):
+        """True if the queue has a capacity and has reached it."""
+        return self.capacity is not None and len(self._customers) >= self.capacity
+
+    def enqueue(self, customer_id, timeout=None):
+        """
+        Adds a customer to the back of the queue.
+
+        Args:
+            customer_id: The customer to add.
+            timeout: For the "block" policy, the most seconds to wait for room (None waits forever).
+
+        Raises:
+            QueueFull: If the queue is full and the customer could not be added.
+        """
+        with self._changed:
+            if self.is_full():
+                if self.overflow == "reject":
+                    raise QueueFull(f"The queue is full ({self.capacity} customers waiting).")
+                if self.overflow == "drop_oldest":
+                    self._customers.popleft()
+                    self.dropped += 1
+                elif not self._changed.wait_for(lambda: not self.is_full(), timeout):
+                    raise QueueFull(f"The queue stayed full for {timeout} seconds.")
+            self._customers.append(customer_id)
+            self._changed.notify_all()
+
+    def enqueue_many(self, customer_ids):
+        """
+        Adds several customers to the back of the queue, in order, and returns how many were added.
+        With the "reject" policy, customers that do not fit are not added (no exception is raised).
+        """
+        customer_ids = list(customer_ids)
+        with self._changed:
+            if self.capacity is not None and self.overflow == "reject":
+                customer_ids = customer_ids[:max(0, self.capacity - len(self._customers))]
+            elif self.capacity is not None and self.overflow == "block":
+                for customer_id in customer_ids:
+                    self.enqueue(customer_id) # Condition is re-entrant (an RLock), so this is safe
+                return len(customer_ids)
+            self._customers.extend(customer_ids)
+            if self.capacity is not None and len(self._customers) > self.capacity:
+                excess = len(self._customers) - self.capacity
+                for _ in range(excess):
+                    self._customers.popleft()
+                self.dropped += excess
+            self._changed.notify_all()
+        return len(customer_ids)
+
+    def dequeue(self):
+        """
+        Removes and returns the customer at the front of the queue.
+
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        with self._changed:
+            if not self._customers:
+                raise IndexError("dequeue from an empty queue")
+            customer_id = self._customers.popleft()
+            self._changed.notify_all()
+            return customer_id
+
+    def dequeue_many(self, max_customers):
+        """Removes and returns up to max_customers customers from the front of the queue, in order."""
+        with self._changed:
+            count = min(max_customers, len(self._customers))
+            customer_ids = [self._customers.popleft() for _ in range(count)]
+            if customer_ids:
+                self._changed.notify_all()
+            return customer_ids
+
+    def head(self):
+        """Returns the customer at the front of the queue without removing them (None if empty)."""
+        return self._customers[0] if self._customers else None
+
+    def tail(self):
+        """Returns the customer at the back of the queue (None if empty)."""
+        return self._customers[-1] if self._customers else None
+
+    def summary(self, edge=DISPLAY_EDGE):
+        """
+        Describes the queue in O(edge) time however long it is: short queues are listed in full,
+        long ones show the first and last edge customers and how many are in between.
+        """
+        count = len(self._customers)
+        if count <= 2 * edge + 1:
+            return str(list(self._customers))
+        first = ", ".join(repr(customer) for customer in islice(self._customers, edge))
+        last = ", ".join(repr(customer) for customer in reversed(list(islice(reversed(self._customers), edge))))
+        return f"[{first}, ... {count - 2 * edge} more ..., {last}] ({count} waiting)"
+
+class TieredSupportQueue:
+    """
+    A support queue with several tiers of customers, each served first-in, first-out within
+    its own lane. Which lane an agent serves next is decided in two steps:
+      - Aging: if the customer at the front of any lane has waited longer than their tier's
+        max_wait, the one whose deadline passed first is served. This keeps SLAs and stops
+        lower tiers from being starved when higher tiers are busy.
+      - Weighted fair sharing: otherwise lanes take turns in proportion to their weights, so
+        with the default tiers VIPs get 4 of every 7 agent turns, SLA customers 2 and standard
+        customers 1 (while all three lanes have customers waiting).
+
+    Both steps use a heap with one entry per lane front, so submitting is O(1) and processing
+    is O(log t) for t tiers. A customer's place in their lane is kept from lane sequence
+    numbers, so position() is O(1).
+    """
+    def __init__(self, tiers=None, clock=time.monotonic):
+        """
+        Args:
+            tiers: Dict of tier name -> {"weight": share of agent turns, "max_wait": seconds},
+                   in order of importance (ties go to the earlier tier). Defaults to DEFAULT_TIERS.
+            clock: Function returning the current time in seconds (replaceable for simulations).
+        """
+        tiers = tiers if tiers is not None else DEFAULT_TIERS
+        if not tiers:
+            raise ValueError("At least one tier is needed.")
+        self.tiers = {name: dict(settings) for name, settings in tiers.items()}
+        self.clock = clock
+        self._lanes = {name: deque() for name in tiers} # (customer_id, sequence number, arrival time)
+        self._served = {name: 0 for name in tiers} # Sequence number of the next customer to leave each lane
+        self._issued = {name: 0 for name in tiers} # Sequence number the next customer to join each lane gets
+        self._order = {name: i for i, name in enumerate(tiers)}
+        self._pass = {name: 0.0 for name in tiers} # Stride-scheduling position; lanes with the lowest go next
+        self._current_pass = 0.0
+        self._fair_heap = [] # (pass, tier order, tier) for each non-empty lane
+        self._deadline_heap = [] # (deadline, tier order, tier, sequence number) for each lane front
+        self._customers = {} # customer_id -> (tier, sequence number), for O(1) position lookups
+
+    def __len__(self):
+        return len(self._customers)
+
+    def __bool__(self):
+        return bool(self._customers)
+
+    def __contains__(self, customer_id):
+        return customer_id in self._customers
+
+    def __str__(self):
+        return self.summary()
+
+    def enqueue(self, customer_id, tier=DEFAULT_TIER):
+        """
+        Adds a customer to the back of their tier's lane.
+
+        Raises:
+            ValueError: If the tier is unknown or the customer is already waiting.
+        """
+        if tier not in self._lanes:
+            raise ValueError(f"Unknown tier '{tier}'. Choose from: {', '.join(self._lanes)}.")
+        if customer_id in self._customers:
+            raise ValueError(f"'{customer_id}' is already waiting.")
+        lane = self._lanes[tier]
+        sequence = self._issued[tier]
+        self._issued[tier] += 1
+        lane.append((customer_id, sequence, self.clock()))
+        self._customers[customer_id] = (tier, sequence)
+        if len(lane) == 1:
+            # A lane that was empty rejoins at the current pass, so it cannot bank turns while idle
+            self._pass[tier] = max(self._pass[tier], self._current_pass)
+            self._schedule(tier)
+
+    def dequeue(self):
+        """
+        Removes and returns the next customer to serve (see the class description for the order).
+
+        Raises:
+            IndexError: If no customers are waiting.
+        """
+        if not self._customers:
+            raise IndexError("dequeue from an empty queue")
+        return self._serve(self._next_tier())
+
+    def dequeue_many(self, max_customers):
+        """Removes and returns up to max_customers customers, in the order they would be served."""
+        return [self.dequeue() for _ in range(min(max_customers, len(self._customers)))]
+
+    def position(self, customer_id):
+        """
+        Returns (tier, place) for a waiting customer, where place 1 means they are at the front
+        of their tier's lane, or None if the customer is not waiting.
+        """
+        entry = self._customers.get(customer_id)
+        if entry is None:
+            return None
+        tier, sequence = entry
+        return tier, sequence - self._served[tier] + 1
+
+    def lengths(self):
+        """Returns a dict of tier -> number of customers waiting in it."""
+        return {tier: len(lane) for tier, lane in self._lanes.items()}
+
+    def summary(self, edge=DISPLAY_EDGE):
+        """Describes each non-empty lane by its first edge customers and its length, in O(edge * t) time."""
+        parts = []
+        for tier, lane in self._lanes.items():
+            if lane:
+                shown = ", ".join(repr(customer_id) for customer_id, sequence, arrival in islice(lane, edge))
+                if len(lane) > edge:
+                    shown += f", ... ({len(lane)} waiting)"
+                parts.append(f"{tier}: [{shown}]")
+        return "; ".join(parts) if parts else "[]"
+
+    def _schedule(self, tier):
+        """Adds the front of a non-empty lane to both heaps."""
+        customer_id, sequence, arrival = self._lanes[tier][0]
+        order = self._order[tier]
+        heapq.heappush(self._fair_heap, (self._pass[tier], order, tier))
+        heapq.heappush(self._deadline_heap, (arrival + self.tiers[tier]["max_wait"], order, tier, sequence))
+
+    def _next_tier(self):
+        """Picks the lane to serve: an overdue lane front first, otherwise the fair-share turn."""
+        # Heap entries left behind when a lane was served by the other heap are skipped lazily
+        deadlines = self._deadline_heap
+        while deadlines and (not self._lanes[deadlines[0][2]] or self._lanes[deadlines[0][2]][0][1] != deadlines[0][3]):
+            heapq.heappop(deadlines)
+        if deadlines and deadlines[0][0] <= self.clock():
+            return deadlines[0][2]
+
+        fair = self._fair_heap
+        while not self._lanes[fair[0][2]] or fair[0][0] != self._pass[fair[0][2]]:
+            heapq.heappop(fair)
+        return fair[0][2]
+
+    def _serve(self, tier):
+        """Removes the customer at the front of a lane and reschedules the lane."""
+        customer_id, sequence, arrival = self._lanes[tier].popleft()
+        del self._customers[customer_id]
+        self._served[tier] = sequence + 1
+        self._current_pass = self._pass[tier]
+        self._pass[tier] += 1 / self.tiers[tier]["weight"] # Heavier tiers advance more slowly, so get more turns
+        if self._lanes[tier]:
+            self._schedule(tier)
+        return customer_id
+
+class DurableSupportQueue:
+    """
+    A FIFO queue of customers kept on disk in a directory, so nobody waiting is lost when the
+    program restarts or crashes.
+
+    Every change is appended to a log split into segment files (segment-00000001.log, ...):
+    an ENQUEUE record when a customer joins, and an ACK record once they have been dealt with.
+    Records carry a CRC, so a record half-written during a crash is detected and cut off.
+
+    The position of the oldest customer not yet acknowledged is kept in consumer.offset, a small
+    memory-mapped file updated in place. On startup only the log after that position is read,
+    so recovery takes time proportional to the customers still waiting, not to the whole history.
+    Segments entirely before that position hold nothing but finished customers, and are deleted.
+
+    Customers can be taken with dequeue() (acknowledged straight away, like SupportQueue), or
+    with receive() and later ack(), in which case a customer whose handling was interrupted by
+    a crash is delivered again after the restart.
+
+    Durability is set by sync:
+      - "always": enqueue and ack return only once the record is on disk. Callers on several
+        threads share each fsync (group commit), so throughput grows with concurrency.
+      - "batch": the log is fsynced every SYNC_BATCH operations, and no later than SYNC_INTERVAL
+        seconds after an operation (a background timer flushes a burst once the queue goes quiet).
+        A process crash loses nothing; a power failure can lose up to that last batch.
+      - "none": the operating system decides when to write to disk.
+    """
+    def __init__(self, directory, sync="batch", segment_bytes=SEGMENT_BYTES):
+        if sync not in SYNC_MODES:
+            raise ValueError(f"sync must be one of {SYNC_MODES}, not {sync!r}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sync = sync
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock) # Group commit: writers wait here for an fsync
+        self._pending = deque() # (sequence, customer_id) waiting to be delivered
+        self._positions = {} # sequence -> (segment, offset) of each unacknowledged ENQUEUE record
+        self._order = deque() # Unacknowledged sequence numbers, oldest first (acknowledged ones are skipped lazily)
+        self._written = 0 # Operations written to the log
+        self._durable = 0 # Operations known to be on disk
+        self._syncing = False
+        self._last_sync = time.monotonic()
+        self._flush_timer = None # In "batch" mode, flushes operations that no later one has flushed
+        self._open_consumer_offset()
+        with self._lock:
+            self._recover()
+
+    # --- Public interface ---
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __bool__(self):
+        return bool(self._pending)
+
+    def __iter__(self):
+        return (customer_id for sequence, customer_id in self._pending)
+
+    def __str__(self):
+        return self.summary()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def enqueue(self, customer_id):
+        """Adds a customer (any JSON-serializable ID) to the back of the queue, and logs it."""
+        with self._lock:
+            self._append_enqueue(customer_id)
+            self._commit()
+
+    def enqueue_many(self, customer_ids):
+        """Adds several customers in order with a single sync, and returns how many were added."""
+        with self._lock:
+            count = 0
+            for customer_id in customer_ids:
+                self._append_enqueue(customer_id)
+                count += 1
+            self._commit()
+        return count
+
+    def receive(self):
+        """
+        Takes the customer at the front of the queue without acknowledging them.
+
+        Returns:
+            (sequence, customer_id); pass sequence to ack() once the customer has been dealt with.
+
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        with self._lock:
+            if not self._pending:
+                raise IndexError("dequeue from an empty queue")
+            return self._pending.popleft()
+
+    def ack(self, sequence):
+        """Records that a received customer has been dealt with, so they are not delivered again."""
+        with self._lock:
+            if sequence not in self._positions:
+                raise KeyError(f"No unacknowledged customer with sequence number {sequence}.")
+            self._append_ack(sequence)
+            self._commit()
+
+    def dequeue(self):
+        """
+        Removes, acknowledges and returns the customer at the front of the queue.
+
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        return self.dequeue_many(1)[0] if self else self.receive()
+
+    def dequeue_many(self, max_customers):
+        """Removes and acknowledges up to max_customers customers with a single sync."""
+        with self._lock:
+            customer_ids = []
+            while self._pending and len(customer_ids) < max_customers:
+                sequence, customer_id = self._pending.popleft()
+                self._append_ack(sequence)
+                customer_ids.append(customer_id)
+            if customer_ids:
+                self._commit()
+            return customer_ids
+
+    def head(self):
+        """Returns the customer at the front of the queue (None if empty)."""
+        return self._pending[0][1] if self._pending else None
+
+    def tail(self):
+        """Returns the customer at the back of the queue (None if empty)."""
+        return self._pending[-1][1] if self._pending else None
+
+    def summary(self, edge=DISPLAY_EDGE):
+        """Describes the queue like SupportQueue.summary, in O(edge) time."""
+        count = len(self._pending)
+        if count <= 2 * edge + 1:
+            return str(list(self))
+        first = ", ".join(repr(customer_id) for sequence, customer_id in islice(self._pending, edge))
+        last = [customer_id for sequence, customer_id in islice(reversed(self._pending), edge)]
+        last = ", ".join(repr(customer_id) for customer_id in reversed(last))
+        return f"[{first}, ... {count - 2 * edge} more ..., {last}] ({count} waiting)"
+
+    def flush(self):
+        """Forces everything written so far onto disk."""
+        with self._lock:
+            self._sync_now()
+
+    def close(self):
+        """Flushes the log and consumer offset to disk and closes the files."""
+        with self._lock:
+            if self._segment_file is None:
+                return
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._sync_now()
+            self._segment_file.close()
+            self._segment_file = None
+            self._offset_map.close()
+            os.close(self._offset_fd)
+
+    # --- Log writing (all called with the lock held) ---
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"segment-{segment:08d}.log")
+
+    def _append_enqueue(self, customer_id):
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        position = self._append_record(RECORD_ENQUEUE, sequence, json.dumps(customer_id).encode('utf-8'))
+        self._pending.append((sequence, customer_id))
+        self._positions[sequence] = position
+        self._order.append(sequence)
+
+    def _append_ack(self, sequence):
+        self._append_record(RECORD_ACK, sequence, b"")
+        del self._positions[sequence]
+
+    def _append_record(self, record_type, sequence, payload):
+        """Appends one record to the active segment and returns its (segment, offset)."""
+        if self._segment_size >= self.segment_bytes:
+            self._rotate()
+        checksum = zlib.crc32(payload, zlib.crc32(struct.pack('<BQ', record_type, sequence)))
+        record = RECORD_HEADER.pack(record_type, len(payload), checksum, sequence) + payload
+        position = (self._segment, self._segment_size)
+        self._segment_file.write(record) # Unbuffered, so a process crash cannot lose it
+        self._segment_size += len(record)
+        self._written += 1
+        return position
+
+    def _rotate(self):
+        """Closes the full active segment and starts the next one."""
+        self._sync_now()
+        self._segment_file.close()
+        self._segment += 1
+        self._segment_file = open(self._segment_path(self._segment), 'ab', buffering=0)
+        self._segment_size = 0
+        self._fsync_directory()
+
+    def _commit(self):
+        """Makes the operations just written as durable as the sync mode asks for."""
+        if self.sync == "always":
+            target = self._written
+            while self._durable < target:
+                if self._syncing:
+                    self._synced.wait() # Another thread's fsync may cover this write too
+                else:
+                    self._sync_now()
+        elif self.sync == "batch":
+            if (self._written - self._durable >= SYNC_BATCH or
+                    time.monotonic() - self._last_sync >= SYNC_INTERVAL):
+                self._sync_now()
+            elif self._flush_timer is None:
+                # Without this, the end of a burst would wait for the next operation, however long that takes
+                self._flush_timer = threading.Timer(SYNC_INTERVAL, self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        else:
+            self._publish_consumer_offset()
+
+    def _timed_flush(self):
+        """Runs on the flush timer's thread: syncs whatever is still unflushed SYNC_INTERVAL after it was written."""
+        with self._lock:
+            self._flush_timer = None
+            if self._segment_file is not None and self._durable < self._written:
+                self._sync_now()
+
+    def _sync_now(self):
+        """
+        fsyncs the active segment, then records the new consumer offset. The lock is released
+        during the fsync, so other threads can keep appending; their records go in the next sync.
+        """
+        while self._syncing:
+            self._synced.wait() # One fsync at a time, so rotation never closes a segment mid-sync
+        target = self._written
+        segment_file = self._segment_file
+        self._syncing = True
+        self._lock.release()
+        try:
+            os.fsync(segment_file.fileno())
+        finally:
+            self._lock.acquire()
+            self._syncing = False
+            self._synced.notify_all()
+        self._durable = max(self._durable, target)
+        self._last_sync = time.monotonic()
+        # Only now that the log is on disk may the offset move past it
+        self._publish_consumer_offset()
+        self._offset_map.flush()
+
+    def _fsync_directory(self):
+        """Makes created segment files durable (not possible on Windows)."""
+        if os.name == 'nt':
+            return
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # --- Consumer offset ---
+
+    def _open_consumer_offset(self):
+        path = os.path.join(self.directory, 'consumer.offset')
+        self._offset_fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._offset_fd).st_size < CONSUMER_OFFSET.size:
+            os.ftruncate(self._offset_fd, CONSUMER_OFFSET.size)
+        self._offset_map = mmap.mmap(self._offset_fd, CONSUMER_OFFSET.size)
+
+    def _publish_consumer_offset(self):
+        """
+        Writes the position of the oldest unacknowledged customer (or the end of the log) into
+        the memory-mapped consumer offset, and deletes segments that now hold only finished customers.
+        """
+        order = self._order
+        while order and order[0] not in self._positions:
+            order.popleft()
+        if order:
+            segment, offset = self._positions[order[0]]
+            sequence = order[0]
+        else:
+            segment, offset, sequence = self._segment, self._segment_size, self._next_sequence
+        CONSUMER_OFFSET.pack_into(self._offset_map, 0, segment, offset, sequence)
+        if segment > self._first_segment:
+            for old in range(self._first_segment, segment):
+                try:
+                    os.remove(self._segment_path(old))
+                except FileNotFoundError:
+                    pass
+            self._first_segment = segment
+
+    # --- Recovery ---
+
+    def _recover(self):
+        """Rebuilds the queue from the consumer offset and the log after it."""
+        start_segment, start_offset, start_sequence = CONSUMER_OFFSET.unpack_from(self._offset_map, 0)
+        segments = sorted(int(name[8:16]) for name in os.listdir(self.directory)
+                          if name.startswith('segment-') and name.endswith('.log'))
+        segments = [segment for segment in segments if segment >= start_segment] or [max(start_segment, 1)]
+        self._next_sequence = max(start_sequence, 1)
+        acked = set()
+        for segment in segments:
+            offset = start_offset if segment == start_segment else 0
+            for record_type, sequence, payload, position in self._read_segment(segment, offset, segment == segments[-1]):
+                self._next_sequence = max(self._next_sequence, sequence + 1)
+                if record_type == RECORD_ENQUEUE:
+                    self._positions[sequence] = (segment, position)
+                    self._pending.append((sequence, json.loads(payload)))
+                    self._order.append(sequence)
+                else:
+                    acked.add(sequence)
+        for sequence in acked:
+            self._positions.pop(sequence, None)
+        self._pending = deque(entry for entry in self._pending if entry[0] in self._positions)
+
+        self._first_segment = segments[0]
+        self._segment = segments[-1]
+        path = self._segment_path(self._segment)
+        self._segment_file = open(path, 'ab', buffering=0)
+        self._segment_size = os.path.getsize(path)
+        self._fsync_directory()
+        self._sync_now()
+
+    def _read_segment(self, segment, offset, is_last):
+        """
+        Yields (type, sequence, payload, position) for each record of a segment from offset.
+        A damaged record at the end of the last segment (a write cut short by a crash) is removed;
+        damage anywhere else means the log is corrupt.
+        """
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        position = offset
+        while position < len(data):
+            header_end = position + RECORD_HEADER.size
+            valid = header_end <= len(data)
+            if valid:
+                record_type, length, checksum, sequence = RECORD_HEADER.unpack_from(data, position)
+                payload = data[header_end:header_end + length]
+                valid = (record_type in (RECORD_ENQUEUE, RECORD_ACK) and len(payload) == length and
+                         zlib.crc32(payload, zlib.crc32(struct.pack('<BQ', record_type, sequence))) == checksum)
+            if not valid:
+                if not is_last:
+                    raise ValueError(f"{path} is corrupt at byte {position}.")
+                with open(path, 'r+b') as f:
+                    f.truncate(position) # Drop the torn write left by a crash
+                return
+            yield record_type, sequence, payload, position
+            position = header_end + length
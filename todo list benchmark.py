@@ -0,0 +1,234 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+# --- Global Variables ---
+TODO_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'todo list.py')
+RESULTS_FILE = 'todo_benchmark_results.jsonl' # Every run is appended here so versions can be compared
+DEFAULT_SIZES = [1000, 100000, 1000000]
+CATEGORIES = ["Work", "Personal", "Home", "Errands", "Health", "Finance", "Study", "Family", "Travel", "Garden"]
+PRIORITY_WEIGHTS = {"High": 2, "Medium": 5, "Low": 3}
+VERBS = ["Write", "Review", "Call", "Buy", "Fix", "Plan", "Email", "Clean", "Prepare", "Book", "Pay", "Update"]
+OBJECTS = ["report", "groceries", "dentist", "car", "budget", "slides", "invoice", "garage", "tickets",
+           "homework", "presentation", "insurance", "birthday gift", "website", "taxes", "laptop"]
+
+# --- Helper Functions ---
+
+def load_todo_module():
+    """Imports 'todo list.py' (its file name has a space, so it cannot be imported normally)."""
+    spec = importlib.util.spec_from_file_location("todo_list", TODO_SCRIPT)
+    todo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(todo)
+    return todo
+
+def generate_tasks(todo, count, seed):
+    """
+    Builds count synthetic tasks with a realistic mix of priorities, categories, due dates,
+    subtasks and completion. Each task may depend on up to two earlier tasks, so the
+    dependency graph is always acyclic, and completed tasks only depend on completed ones.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    priorities = list(PRIORITY_WEIGHTS)
+    weights = list(PRIORITY_WEIGHTS.values())
+    generated = []
+    for i in range(count):
+        is_complete = rng.random() < 0.6 # Completed tasks dominate a long-lived list
+        due_date = ""
+        if rng.random() < 0.7:
+            due_date = (today + timedelta(days=rng.randint(-90, 90))).isoformat()
+        dependencies = []
+        if i and rng.random() < 0.2:
+            for _ in range(rng.randint(1, 2)):
+                prerequisite = generated[rng.randrange(max(0, i - 1000), i)]
+                if prerequisite["id"] not in dependencies and (prerequisite["is_complete"] or not is_complete):
+                    dependencies.append(prerequisite["id"])
+        subtasks = [todo.Subtask(str(uuid.UUID(int=rng.getrandbits(128))), f"Step {n + 1}", is_complete or rng.random() < 0.5)
+                    for n in range(rng.choice([0, 0, 0, 1, 2, 3]))]
+        generated.append(todo.Task(
+            str(uuid.UUID(int=rng.getrandbits(128))),
+            f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} #{i}",
+            rng.choices(priorities, weights)[0],
+            rng.sample(CATEGORIES, rng.choice([0, 1, 1, 2])),
+            due_date,
+            is_complete,
+            dependencies,
+            subtasks
+        ))
+    return generated
+
+def scripted_input(answers):
+    """Returns a replacement for input() that gives the answers in order, then 'q' to stop any paging."""
+    remaining = iter(answers)
+    return lambda prompt="": next(remaining, 'q')
+
+def time_operation(operation, repeat):
+    """Runs operation repeat times with its output discarded and returns the elapsed seconds of each run."""
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            operation()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+def percentile(timings, fraction):
+    """Returns the nearest-rank percentile of a list of timings."""
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(size, name, timings):
+    """Turns raw timings into throughput and latency percentiles (in milliseconds)."""
+    return {
+        "size": size,
+        "operation": name,
+        "runs": len(timings),
+        "ops_per_sec": len(timings) / sum(timings) if sum(timings) else float("inf"),
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "max_ms": max(timings) * 1000
+    }
+
+def point_storage_at(todo, directory):
+    """Makes the todo module keep its files in directory instead of the current working directory."""
+    todo.TASKS_FILE = os.path.join(directory, 'tasks.json')
+    todo.JOURNAL_FILE = os.path.join(directory, 'tasks.journal')
+    todo.SNAPSHOT_INDEX_FILE = os.path.join(directory, 'tasks.json.idx')
+    todo.LOCK_FILE = os.path.join(directory, 'tasks.lock')
+    todo.DATABASE_FILE = os.path.join(directory, 'tasks.db')
+
+# --- Benchmarks ---
+
+def benchmark_size(size, repeat, lookups, seed, measure_memory):
+    """Runs every benchmark against a fresh store of size synthetic tasks and returns the result rows."""
+    todo = load_todo_module()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        point_storage_at(todo, directory)
+        print(f"Generating {size} tasks...")
+        todo.tasks = generate_tasks(todo, size, seed)
+        todo.rebuild_indexes()
+        results.append(summarize(size, "save_tasks (compaction)", time_operation(todo.compact_tasks, 1)))
+        file_size = os.path.getsize(todo.TASKS_FILE)
+
+        # Startup path: load the snapshot, then show today's reminders
+        results.append(summarize(size, "load_tasks", time_operation(todo.load_tasks, repeat)))
+        results.append(summarize(size, "check_reminders", time_operation(todo.check_reminders, repeat)))
+        if measure_memory:
+            tracemalloc.start()
+            with contextlib.redirect_stdout(io.StringIO()):
+                todo.load_tasks()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append(summarize(size, "load completed tasks", time_operation(todo.ensure_archive_loaded, 1)))
+
+        rng = random.Random(seed)
+        sample_ids = [task["id"] for task in rng.sample(todo.tasks, min(lookups, len(todo.tasks)))]
+        lookup_ids = iter(sample_ids * repeat)
+        results.append(summarize(size, "get_task_by_id", time_operation(lambda: todo.get_task_by_id(next(lookup_ids)), len(sample_ids))))
+        prefix_ids = iter([task_id[:8] for task_id in sample_ids])
+        results.append(summarize(size, "resolve_task_id (8-char prefix)",
+                                 time_operation(lambda: todo.resolve_task_id(next(prefix_ids)), len(sample_ids))))
+
+        today = date.today().isoformat()
+        views = {
+            "1 all": ['1'], "2 incomplete": ['2'], "3 complete": ['3'], "4 category": ['4', 'Work'],
+            "5 priority": ['5', 'High'], "6 upcoming": ['6'], "7 ready": ['7']
+        }
+        for name, answers in views.items():
+            results.append(summarize(size, f"view_tasks {name}", time_scripted(todo, todo.view_tasks, answers, repeat)))
+        searches = {"1 keyword": ['1', 'review report'], "2 category": ['2', 'Finance'], "3 due date": ['3', today]}
+        for name, answers in searches.items():
+            results.append(summarize(size, f"search_tasks {name}", time_scripted(todo, todo.search_tasks, answers, repeat)))
+
+        ready_ids = list(todo.ready_task_ids)[:lookups]
+        results.append(summarize(size, "mark_complete",
+                                 [t for task_id in ready_ids for t in time_scripted(todo, todo.mark_complete, [task_id], 1)]))
+        results.append(summarize(size, "save_tasks (journal)", time_operation(todo.save_tasks, 1)))
+
+    for row in results:
+        row["file_bytes"] = file_size
+        if measure_memory:
+            row["load_peak_mb"] = peak_bytes / 1e6
+    return results
+
+def time_scripted(todo, function, answers, repeat):
+    """Times an interactive menu function, feeding it the given answers instead of reading the keyboard."""
+    timings = []
+    for _ in range(repeat):
+        todo.input = scripted_input(answers)
+        timings.extend(time_operation(function, 1))
+    del todo.input
+    return timings
+
+# --- Reporting ---
+
+def current_version():
+    """Returns the current git commit of the repository, or 'unknown' outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(TODO_SCRIPT),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def load_previous_results(results_file):
+    """Returns the most recent saved result for each (size, operation) pair."""
+    previous = {}
+    if os.path.exists(results_file):
+        with open(results_file, 'r') as f:
+            for line in f:
+                row = json.loads(line)
+                previous[(row["size"], row["operation"])] = row
+    return previous
+
+def print_report(results, previous):
+    """Prints a results table, with the change in median latency since the previous saved run."""
+    print(f"\n{'size':>9} {'operation':<34} {'ops/s':>11} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'vs prev':>9}")
+    for row in results:
+        earlier = previous.get((row["size"], row["operation"]))
+        change = ""
+        if earlier and earlier["p50_ms"]:
+            change = f"{(row['p50_ms'] - earlier['p50_ms']) / earlier['p50_ms']:+.0%}"
+        print(f"{row['size']:>9} {row['operation']:<34} {row['ops_per_sec']:>11.1f} {row['p50_ms']:>10.3f} "
+              f"{row['p95_ms']:>10.3f} {row['p99_ms']:>10.3f} {change:>9}")
+    for size in sorted({row["size"] for row in results}):
+        row = next(row for row in results if row["size"] == size)
+        memory = f", peak memory while loading {row['load_peak_mb']:.1f} MB" if "load_peak_mb" in row else ""
+        print(f"{size} tasks: {row['file_bytes'] / 1e6:.1f} MB on disk{memory}")
+
+def save_results(results, results_file, label):
+    """Appends this run's results to results_file, tagged with a label and timestamp."""
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    with open(results_file, 'a') as f:
+        for row in results:
+            f.write(json.dumps(dict(row, label=label, timestamp=timestamp)) + "\n")
+    print(f"\nSaved {len(results)} results to {results_file} (label: {label}).")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the to-do list application on synthetic task sets.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="task counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each view, search and load")
+    parser.add_argument("--lookups", type=int, default=1000, help="ID lookups and completions to time")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, so task sets are reproducible")
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slow) tracemalloc memory measurement")
+    parser.add_argument("--results", default=RESULTS_FILE, help="file the results are appended to")
+    parser.add_argument("--label", default=None, help="name for this run (defaults to the git commit)")
+    args = parser.parse_args()
+
+    previous = load_previous_results(args.results)
+    all_results = []
+    for size in args.sizes:
+        all_results.extend(benchmark_size(size, args.repeat, args.lookups, args.seed, not args.no_memory))
+    print_report(all_results, previous)
+    save_results(all_results, args.results, args.label or current_version())
@@ -1,22 +1,221 @@
+import argparse
+import bisect
+import contextlib
+import heapq
 import json
+import mmap
 import os
+import sqlite3
+import sys
 import uuid
-from datetime import datetime
+from datetime import date, datetime
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
 
 # --- Global Variables ---
 TASKS_FILE = 'tasks.json'
-tasks = [] # This will store our list of task dictionaries
+JOURNAL_FILE = 'tasks.journal' # Append-only log of changes made since the last snapshot
+SNAPSHOT_INDEX_FILE = 'tasks.json.idx' # Records where the completed tasks start in TASKS_FILE
+ARCHIVE_IDS_FILE = 'tasks.json.ids' # Sorted IDs of the completed tasks in TASKS_FILE, with the byte offset of each
+LOCK_FILE = 'tasks.lock' # Locked briefly by whichever session is reading or writing the shared files
+COMPACT_THRESHOLD = 1000 # Rewrite the snapshot once the journal holds this many changes
+STORAGE_BACKEND = 'json' # 'json' for TASKS_FILE plus journal, or 'sqlite' for DATABASE_FILE
+DATABASE_FILE = 'tasks.db'
+database = None # Open sqlite3 connection when the SQLite backend is in use
+database_has_fts = False # Whether the SQLite build supports the FTS5 trigram index used for keyword search
+tasks = [] # This will store our list of Task records
+archived_task_count = 0 # Completed tasks left in TASKS_FILE that have not been loaded yet
+archive_offset = 0 # Byte offset in TASKS_FILE where the completed tasks start
+archive_lookup = None # (sorted IDs, byte offsets) read from ARCHIVE_IDS_FILE on first use; False if it is unusable
+journal = None # Open handle on JOURNAL_FILE, created on the first change
+journal_entries = 0 # Number of change records currently in the journal
+journal_position = 0 # How many bytes of JOURNAL_FILE this session has already applied
+snapshot_generation = None # Changes whenever any session compacts the journal into a new snapshot
+database_revision = 0 # Highest revision number this session has seen in the database
+pending_bases = {} # Maps a task ID to its saved state from just before the current edit began
+lock_depth = 0 # How many nested task_store_lock() blocks this session is inside
+tasks_by_id = {} # Maps each task ID to its Task record
+sorted_task_ids = [] # All task IDs in sorted order, used to resolve shortened IDs
+task_positions = {} # Maps each task ID to its position in the tasks list, used to keep results in list order
+descriptions_lower = {} # Maps each task ID to its lowercased description
+tasks_by_description = {} # Maps each lowercased description to the set of task IDs that have it
+description_trigrams = {} # Inverted index: maps each 3-character substring to the set of task IDs containing it
+tasks_by_category = {} # Maps each lowercased category to the set of task IDs in it
+tasks_by_priority = {} # Maps each priority to the set of task IDs that have it
+due_date_index = [] # Sorted list of (due date ordinal, task ID) pairs for tasks that have a due date
+dependents_by_id = {} # Reverse dependency edges: maps a prerequisite's ID to the IDs of tasks that depend on it
+pending_prerequisite_counts = {} # Maps each task ID to how many of its prerequisites are still incomplete
+ready_task_ids = set() # IDs of incomplete tasks whose prerequisites are all complete
+PAGE_SIZE = 25 # Tasks shown per page in views and search results (0 shows everything at once)
+RENDER_CHUNK_LINES = 512 # Output lines collected before each write to the console
+PRIORITY_OPTIONS = ["High", "Medium", "Low"]
+PRIORITY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+
+# --- Task Records ---
+
+class Subtask:
+    """
+    A compact subtask record. The ID is kept as a 128-bit integer when it is a UUID.
+    Fields can be read and written like dictionary keys, e.g. subtask["is_complete"].
+    """
+    __slots__ = ("_id", "description", "is_complete")
+
+    def __init__(self, id, description, is_complete=False):
+        self.id = id
+        self.description = description
+        self.is_complete = is_complete
+
+    @property
+    def id(self):
+        return str(uuid.UUID(int=self._id)) if isinstance(self._id, int) else self._id
+
+    @id.setter
+    def id(self, value):
+        try:
+            self._id = uuid.UUID(value).int
+        except ValueError:
+            self._id = value # Not a UUID, so keep the original text
+            return
+        if str(uuid.UUID(int=self._id)) != value:
+            self._id = value # Keep unusual spellings such as uppercase UUIDs exactly as written
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def to_dict(self):
+        """Returns the subtask in the tasks.json format."""
+        return {"id": self.id, "description": self.description, "is_complete": self.is_complete}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["description"], data["is_complete"])
+
+class Task:
+    """
+    A compact task record that uses __slots__ instead of a per-task dictionary.
+
+    Priorities and categories are interned so every task shares one copy of each string,
+    categories are stored as a tuple, and due dates are stored as date ordinals.
+    Task IDs stay strings, because they key every index, but are interned so that
+    dependency lists share the task's own ID string instead of holding copies.
+    Fields can be read and written like dictionary keys, e.g. task["due_date"], and
+    to_dict()/from_dict() convert to and from the tasks.json format.
+    """
+    __slots__ = ("id", "description", "_priority", "_categories", "_due", "is_complete", "dependencies", "subtasks",
+                 "version")
+
+    def __init__(self, id, description, priority, categories=(), due_date="", is_complete=False,
+                 dependencies=(), subtasks=(), version=0):
+        self.id = sys.intern(id)
+        self.description = description
+        self.priority = priority
+        self.categories = categories
+        self.due_date = due_date
+        self.is_complete = is_complete
+        self.dependencies = [sys.intern(dep_id) for dep_id in dependencies]
+        self.subtasks = list(subtasks)
+        self.version = version # Incremented every time the task is saved, to detect concurrent edits
+
+    @property
+    def priority(self):
+        return self._priority
+
+    @priority.setter
+    def priority(self, value):
+        self._priority = sys.intern(value)
+
+    @property
+    def categories(self):
+        return self._categories
+
+    @categories.setter
+    def categories(self, value):
+        self._categories = tuple(sys.intern(category) for category in value)
+
+    @property
+    def due_date(self):
+        if isinstance(self._due, int):
+            return date.fromordinal(self._due).isoformat() if self._due else ""
+        return self._due # A due date that could not be parsed is kept as written
+
+    @due_date.setter
+    def due_date(self, value):
+        self._due = parse_due_date(value) if value else 0
+        if value and not self._due:
+            self._due = value
+
+    @property
+    def due_ordinal(self):
+        """The due date as a date ordinal, or 0 if the task has no valid due date."""
+        return self._due if isinstance(self._due, int) else 0
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def to_dict(self):
+        """Returns the task in the tasks.json format."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "priority": self.priority,
+            "categories": list(self.categories),
+            "due_date": self.due_date,
+            "is_complete": self.is_complete,
+            "dependencies": list(self.dependencies),
+            "subtasks": [subtask.to_dict() for subtask in self.subtasks],
+            "version": self.version
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["id"], data["description"], data["priority"], data["categories"], data["due_date"],
+                   data["is_complete"], data["dependencies"], [Subtask.from_dict(sub) for sub in data["subtasks"]],
+                   data.get("version", 0))
 
 # --- Helper Functions ---
 
 def load_tasks():
-    """Loads tasks from the TASKS_FILE. If the file doesn't exist, initializes an empty list."""
-    global tasks
+    """Loads tasks from the storage backend selected by STORAGE_BACKEND and builds the lookup indexes."""
+    if STORAGE_BACKEND == 'sqlite':
+        load_tasks_from_database()
+    else:
+        with task_store_lock():
+            load_tasks_from_json()
+    rebuild_indexes()
+
+def load_tasks_from_json():
+    """
+    Loads the snapshot in TASKS_FILE, then replays any changes recorded in JOURNAL_FILE on top of it.
+    When the snapshot has an index, only the incomplete tasks at the front of the file are read;
+    the completed tasks after them are left on disk until ensure_archive_loaded() needs them.
+    """
+    global tasks, archived_task_count, archive_offset, snapshot_generation, archive_lookup
+    archived_task_count = 0
+    archive_lookup = None
+    snapshot_generation = read_snapshot_generation()
     if os.path.exists(TASKS_FILE):
         try:
-            with open(TASKS_FILE, 'r') as f:
-                tasks = json.load(f)
-            print(f"Loaded {len(tasks)} tasks from {TASKS_FILE}.")
+            snapshot_index = read_snapshot_index()
+            if snapshot_index:
+                archive_offset = snapshot_index["archive_offset"]
+                tasks = list(read_snapshot_tasks(0, archive_offset))
+                archived_task_count = snapshot_index["archive_count"]
+                print(f"Loaded {len(tasks)} active tasks from {TASKS_FILE} "
+                      f"({archived_task_count} completed tasks will be loaded when needed).")
+            else:
+                with open(TASKS_FILE, 'r') as f:
+                    tasks = [Task.from_dict(data) for data in json.load(f)]
+                print(f"Loaded {len(tasks)} tasks from {TASKS_FILE}.")
         except json.JSONDecodeError:
             print(f"Error reading {TASKS_FILE}. Starting with an empty list.")
             tasks = []
@@ -26,21 +225,987 @@ def load_tasks():
     else:
         print("No existing tasks file found. Starting with an empty list.")
         tasks = []
+    replay_journal()
+
+def read_snapshot_index():
+    """Returns the index written alongside TASKS_FILE, or None if it is missing or belongs to an older snapshot."""
+    if not os.path.exists(SNAPSHOT_INDEX_FILE):
+        return None
+    try:
+        with open(SNAPSHOT_INDEX_FILE, 'r') as f:
+            snapshot_index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if snapshot_index.get("snapshot_size") != os.path.getsize(TASKS_FILE):
+        return None
+    return snapshot_index
+
+def read_snapshot_generation():
+    """Returns the generation recorded by the last compaction, or None if there is no snapshot index."""
+    try:
+        with open(SNAPSHOT_INDEX_FILE, 'r') as f:
+            return json.load(f).get("generation")
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def read_snapshot_tasks(start, end=None):
+    """
+    Yields the tasks stored between byte offsets start and end of TASKS_FILE.
+    Snapshots hold one task per line, so the file is memory-mapped and parsed a line at a time
+    instead of being read and decoded as a whole.
+    """
+    with open(TASKS_FILE, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = len(mapped) if end is None else end
+            mapped.seek(start)
+            while mapped.tell() < end:
+                line = mapped.readline().strip()
+                if line and line not in (b"[", b"]"):
+                    yield Task.from_dict(json.loads(line.rstrip(b",")))
+
+def ensure_archive_loaded():
+    """Loads the completed tasks that load_tasks() left on disk, skipping any the journal already replaced."""
+    global archived_task_count
+    if not archived_task_count:
+        return
+    with task_store_lock():
+        # Another session may have compacted the snapshot since it was loaded, which moves the
+        # archive; syncing reloads it in that case, so archive_offset is current while we hold the lock
+        if database is not None:
+            sync_database()
+        else:
+            sync_journal()
+        if database is not None:
+            archived_tasks = read_database_tasks("t.is_complete = 1")
+        else:
+            archived_tasks = list(read_snapshot_tasks(archive_offset))
+    archived_task_count = 0
+    archived_tasks = [task for task in archived_tasks if task["id"] not in tasks_by_id]
+    tasks.extend(archived_tasks)
+    index_tasks(archived_tasks)
+
+def read_archive_lookup():
+    """
+    Returns (sorted IDs, byte offsets) of the completed tasks in TASKS_FILE, reading ARCHIVE_IDS_FILE
+    the first time, or None if that file is missing or was written for a different snapshot.
+    The caller holds the lock and has synced, so snapshot_generation is current.
+    """
+    global archive_lookup
+    if archive_lookup is None:
+        archive_lookup = False
+        try:
+            with open(ARCHIVE_IDS_FILE, 'r') as f:
+                if f.readline().rstrip("\n") == snapshot_generation:
+                    entries = [line.rstrip("\n").rsplit(" ", 1) for line in f]
+                    archive_lookup = ([task_id for task_id, offset in entries],
+                                      [int(offset) for task_id, offset in entries])
+        except (OSError, ValueError):
+            pass
+    return archive_lookup or None
+
+def load_archived_tasks_by_prefix(prefix, limit=None):
+    """
+    Loads just the completed tasks whose ID starts with prefix (at most limit of them) from
+    TASKS_FILE, finding them by binary search of the archive's ID list instead of loading the
+    whole archive. Returns False if there is no usable ID list, so the caller must load it all.
+    """
+    global archived_task_count
+    with task_store_lock():
+        sync_journal() # A compaction by another session moves every archived task
+        if not archived_task_count:
+            return True
+        lookup = read_archive_lookup()
+        if lookup is None:
+            return False
+        archived_ids, offsets = lookup
+        i = bisect.bisect_left(archived_ids, prefix)
+        found = 0
+        while i < len(archived_ids) and archived_ids[i].startswith(prefix) and (limit is None or found < limit):
+            if archived_ids[i] not in tasks_by_id: # Otherwise the journal holds a newer version
+                task = next(read_snapshot_tasks(offsets[i], offsets[i] + 1))
+                tasks.append(task)
+                index_task(task)
+                archived_task_count -= 1
+            found += 1
+            i += 1
+    return True
+
+def replay_journal():
+    """Applies the change records in JOURNAL_FILE to the tasks loaded from the snapshot. The caller holds the lock."""
+    global journal_entries, journal_position
+    journal_entries = 0
+    journal_position = 0
+    if not os.path.exists(JOURNAL_FILE):
+        return
+
+    positions = {task["id"]: i for i, task in enumerate(tasks)}
+    with open(JOURNAL_FILE, 'rb') as f:
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("record is not terminated")
+                record = json.loads(line)
+            except ValueError:
+                # A crash mid-write can only leave the last record incomplete. Nobody else can be
+                # writing while we hold the lock, so cut it off before new records are appended.
+                print(f"Removing incomplete change record at the end of {JOURNAL_FILE}.")
+                break
+            task = Task.from_dict(record["task"])
+            if task["id"] in positions:
+                tasks[positions[task["id"]]] = task
+            else:
+                positions[task["id"]] = len(tasks)
+                tasks.append(task)
+            journal_entries += 1
+            journal_position += len(line)
+    if journal_position < os.path.getsize(JOURNAL_FILE):
+        os.truncate(JOURNAL_FILE, journal_position)
+    if journal_entries:
+        print(f"Replayed {journal_entries} changes from {JOURNAL_FILE}.")
+
+def begin_change(task):
+    """Remembers a task's saved state before it is edited, so record_change() can merge concurrent edits."""
+    pending_bases[task["id"]] = task.to_dict()
+
+def record_change(task):
+    """
+    Saves the current state of a new or modified task, appending it to the journal or writing it to the database.
+
+    The store is only locked while the change is written. Changes other sessions saved in the
+    meantime are applied first, and if one of them touched this same task the two edits are
+    merged field by field. Returns False if they conflict, in which case the other session's
+    version is kept and this change is dropped. The same happens if, given the other sessions'
+    changes, a dependency added here would now be circular or a task completed here has an
+    incomplete prerequisite.
+    """
+    base = pending_bases.pop(task["id"], None)
+    ours = task.to_dict()
+    with task_store_lock():
+        if database is not None:
+            sync_database()
+        else:
+            sync_journal()
+
+        current = get_task_by_id(task["id"])
+        saved_state = base
+        if current is None:
+            # A new task, which reloading another session's snapshot may have dropped from memory
+            current = task
+            tasks.append(task)
+            index_task(task)
+        elif base is not None and current["version"] != base["version"]:
+            saved_state = current.to_dict()
+            merged = merge_task_states(base, ours, saved_state)
+            if merged is None:
+                print(f"Task '{current['description']}' was changed by another session in a way that "
+                      "conflicts with this change, so this change was not saved.")
+                return False
+            set_task_state(current, merged)
+        elif current is not task:
+            # Another session's compaction made us reload, but nobody else changed this task
+            set_task_state(current, ours)
+
+        if base is not None:
+            # The checks made before the lock was taken may not hold against the synced state
+            problem = check_dependency_rules(current, base, ours)
+            if problem:
+                set_task_state(current, saved_state)
+                print(f"{problem}, so this change was not saved.")
+                return False
+
+        current["version"] += 1
+        write_change(current)
+    return True
+
+def check_dependency_rules(task, base, ours):
+    """
+    Returns a message if the dependencies this session added (base -> ours) create a cycle, or if
+    it completed a task that has incomplete prerequisites, judged against the current state of
+    every task. Returns None if the change is allowed.
+    """
+    for dep_id in ours["dependencies"]:
+        if dep_id not in base["dependencies"] and creates_dependency_cycle(task["id"], dep_id):
+            return (f"Another session made '{get_task_description_by_id(dep_id)}' depend (directly or "
+                    f"indirectly) on '{task['description']}'")
+    if ours["is_complete"] and not base["is_complete"] and get_pending_prerequisites(task):
+        return f"Another session gave '{task['description']}' a prerequisite that is not yet complete"
+    return None
+
+def write_change(task):
+    """Writes one task to the journal or the database. The caller holds the lock and has synced first."""
+    global journal, journal_entries, journal_position, database_revision
+    if database is not None:
+        database_revision += 1
+        write_task_row(database, task, database_revision)
+        return
+    if journal is None:
+        journal = open(JOURNAL_FILE, 'a')
+    journal.write(json.dumps({"op": "put", "task": task.to_dict()}) + "\n")
+    journal.flush()
+    journal_position = os.fstat(journal.fileno()).st_size
+    journal_entries += 1
 
 def save_tasks():
-    """Saves the current tasks list to the TASKS_FILE."""
+    """Makes the journal durable, compacting it into a fresh TASKS_FILE snapshot once it grows large."""
+    global journal
+    if database is not None:
+        print(f"All changes are already saved to {DATABASE_FILE}.")
+        return
     try:
-        with open(TASKS_FILE, 'w') as f:
-            json.dump(tasks, f, indent=4)
-        print(f"Saved {len(tasks)} tasks to {TASKS_FILE}.")
+        with task_store_lock():
+            sync_journal() # A compaction must include every other session's changes
+            if journal is not None:
+                os.fsync(journal.fileno())
+            if journal_entries >= COMPACT_THRESHOLD or not os.path.exists(TASKS_FILE) or not read_snapshot_index():
+                compact_tasks()
+            else:
+                print(f"Saved {journal_entries} pending changes to {JOURNAL_FILE}.")
     except Exception as e:
         print(f"Error saving tasks to {TASKS_FILE}: {e}")
 
-def get_task_by_id(task_id):
-    """Finds and returns a task dictionary by its ID."""
+def compact_tasks():
+    """Writes every task to a new snapshot and empties the journal.
+
+    The snapshot is still a JSON list, but it holds one task per line with the incomplete
+    tasks first, and SNAPSHOT_INDEX_FILE records the byte offset where the completed ones
+    begin so that load_tasks() can stop reading there.
+
+    The snapshot is written to a temporary file and swapped in with os.replace, so
+    TASKS_FILE always holds either the old or the new snapshot, never a partial one.
+    """
+    global journal, journal_entries, journal_position, archive_offset, snapshot_generation, archive_lookup
+    ensure_archive_loaded()
+    archive_lookup = None
+    active_tasks = [task for task in tasks if not task["is_complete"]]
+    completed_tasks = [task for task in tasks if task["is_complete"]]
+    completed_offsets = []
+
+    temp_file = TASKS_FILE + '.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(b"[\n")
+        archive_offset = f.tell()
+        for i, task in enumerate(active_tasks + completed_tasks):
+            if i == len(active_tasks):
+                archive_offset = f.tell()
+            if i >= len(active_tasks):
+                completed_offsets.append(f.tell())
+            separator = b",\n" if i < len(tasks) - 1 else b"\n"
+            f.write(json.dumps(task.to_dict(), separators=(",", ":")).encode() + separator)
+        if len(completed_tasks) == 0:
+            archive_offset = f.tell()
+        f.write(b"]\n")
+        f.flush()
+        os.fsync(f.fileno())
+        snapshot_size = f.tell()
+    os.replace(temp_file, TASKS_FILE)
+
+    # A crash before the index is replaced leaves a size mismatch, which makes
+    # load_tasks() fall back to reading the whole snapshot.
+    # The new generation tells other sessions that their journal position no longer applies.
+    snapshot_generation = uuid.uuid4().hex
+    # The ID list is only trusted when its first line matches the index's generation
+    with open(ARCHIVE_IDS_FILE + '.tmp', 'w') as f:
+        f.write(snapshot_generation + "\n")
+        f.writelines(f"{task_id} {offset}\n" for task_id, offset in
+                     sorted(zip((task["id"] for task in completed_tasks), completed_offsets)))
+    os.replace(ARCHIVE_IDS_FILE + '.tmp', ARCHIVE_IDS_FILE)
+    with open(SNAPSHOT_INDEX_FILE + '.tmp', 'w') as f:
+        json.dump({"snapshot_size": snapshot_size, "archive_offset": archive_offset,
+                   "archive_count": len(completed_tasks), "generation": snapshot_generation}, f)
+    os.replace(SNAPSHOT_INDEX_FILE + '.tmp', SNAPSHOT_INDEX_FILE)
+
+    # Replaying the old journal on top of the new snapshot would be harmless, so a
+    # crash before it is removed below loses nothing.
+    if journal is not None:
+        journal.close()
+        journal = None
+    if os.path.exists(JOURNAL_FILE):
+        os.remove(JOURNAL_FILE)
+    journal_entries = 0
+    journal_position = 0
+    print(f"Saved {len(tasks)} tasks to {TASKS_FILE}.")
+
+# --- Concurrent Access ---
+
+@contextlib.contextmanager
+def task_store_lock():
+    """
+    Gives this session exclusive access to the task store for the duration of a with block.
+    For the JSON backend this is an OS lock on LOCK_FILE; for SQLite it is an immediate
+    transaction that is committed when the block ends. Nested blocks share the outer lock.
+    """
+    global lock_depth
+    if lock_depth:
+        lock_depth += 1
+        try:
+            yield
+        finally:
+            lock_depth -= 1
+        return
+
+    if database is not None:
+        database.execute("BEGIN IMMEDIATE")
+        lock_depth = 1
+        try:
+            yield
+            database.commit()
+        except BaseException:
+            database.rollback()
+            raise
+        finally:
+            lock_depth = 0
+        return
+
+    with open(LOCK_FILE, 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        lock_depth = 1
+        try:
+            yield
+        finally:
+            lock_depth = 0
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def sync_changes():
+    """Applies the changes other sessions have saved since this session last looked."""
+    with task_store_lock():
+        if database is not None:
+            sync_database()
+        else:
+            sync_journal()
+
+def sync_journal():
+    """Applies journal records appended by other sessions since journal_position. The caller holds the lock."""
+    global journal, journal_entries, journal_position
+    if read_snapshot_generation() != snapshot_generation:
+        # Another session compacted the journal into a new snapshot, so start again from that
+        if journal is not None:
+            journal.close()
+            journal = None
+        print("Another session has rewritten the task file. Reloading tasks.")
+        load_tasks()
+        return
+    if not os.path.exists(JOURNAL_FILE):
+        return
+    with open(JOURNAL_FILE, 'rb') as f:
+        f.seek(journal_position)
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("record is not terminated")
+                record = json.loads(line)
+            except ValueError:
+                # Left by a session that crashed mid-write, as in replay_journal()
+                print(f"Removing incomplete change record at the end of {JOURNAL_FILE}.")
+                break
+            apply_saved_state(record["task"])
+            journal_entries += 1
+            journal_position += len(line)
+    if journal_position < os.path.getsize(JOURNAL_FILE):
+        os.truncate(JOURNAL_FILE, journal_position)
+
+def sync_database():
+    """Applies rows written by other sessions since database_revision. The caller holds the lock."""
+    global database_revision
+    # In the order they were saved, so a new prerequisite is known before a task that depends on it
+    for task in read_database_tasks("t.revision > ?", (database_revision,), order_by="t.revision"):
+        apply_saved_state(task.to_dict())
+    database_revision = database.execute("SELECT COALESCE(MAX(revision), 0) FROM tasks").fetchone()[0]
+
+def apply_saved_state(state):
+    """Brings this session's copy of a task up to date with a state another session saved."""
+    task = tasks_by_id.get(state["id"])
+    if task is None:
+        task = Task.from_dict(state)
+        tasks.append(task)
+        index_task(task)
+    else:
+        set_task_state(task, state)
+
+def set_task_state(task, state):
+    """Overwrites a task's fields with a saved state, keeping the indexes and dependency graph up to date."""
+    unindex_task(task)
+    task["description"] = state["description"]
+    task["priority"] = state["priority"]
+    task["categories"] = state["categories"]
+    task["due_date"] = state["due_date"]
+    task["subtasks"] = [Subtask.from_dict(subtask) for subtask in state["subtasks"]]
+    task["version"] = state.get("version", 0)
+    index_task(task)
+    if task["dependencies"] != state["dependencies"]:
+        set_dependencies(task, state["dependencies"])
+    if task["is_complete"] != state["is_complete"]:
+        if state["is_complete"]:
+            complete_task(task)
+        else:
+            reopen_task(task)
+
+def merge_task_states(base, ours, theirs):
+    """
+    Three-way merges this session's edit of a task (base -> ours) with another session's saved state (theirs).
+    Returns the merged state, or None if both sessions changed the same field to different values.
+    Dependencies are merged as sets and subtasks by ID, so two sessions adding to them never conflict.
+    """
+    merged = dict(theirs)
+    for field, value in ours.items():
+        if field == "version" or value == base[field] or value == theirs[field]:
+            continue
+        if field == "dependencies":
+            merged[field] = theirs[field] + [dep_id for dep_id in value
+                                             if dep_id not in theirs[field] and dep_id not in base[field]]
+        elif field == "subtasks":
+            merged[field] = merge_subtask_states(base[field], value, theirs[field])
+            if merged[field] is None:
+                return None
+        elif theirs[field] != base[field]:
+            return None
+        else:
+            merged[field] = value
+    return merged
+
+def merge_subtask_states(base, ours, theirs):
+    """Merges two edited subtask lists by subtask ID, returning None if both changed the same subtask differently."""
+    base_by_id = {subtask["id"]: subtask for subtask in base}
+    merged = list(theirs)
+    positions = {subtask["id"]: i for i, subtask in enumerate(merged)}
+    for subtask in ours:
+        original = base_by_id.get(subtask["id"])
+        if subtask == original:
+            continue
+        if subtask["id"] not in positions:
+            merged.append(subtask)
+            continue
+        current = merged[positions[subtask["id"]]]
+        if current != original and current != subtask:
+            return None
+        merged[positions[subtask["id"]]] = subtask
+    return merged
+
+# --- SQLite Storage ---
+
+def open_database():
+    """Opens DATABASE_FILE in WAL mode and creates the tables and indexes if they do not exist yet."""
+    global database_has_fts
+    connection = sqlite3.connect(DATABASE_FILE)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=FULL") # fsync the WAL on every commit, so a saved change survives a power loss
+    connection.executescript("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            description TEXT NOT NULL,
+            description_lower TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            due_date TEXT NOT NULL,
+            due_ordinal INTEGER NOT NULL,
+            is_complete INTEGER NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            revision INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS task_categories (
+            task_id TEXT NOT NULL REFERENCES tasks(id),
+            category TEXT NOT NULL,
+            category_lower TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS dependencies (
+            task_id TEXT NOT NULL REFERENCES tasks(id),
+            prerequisite_id TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS subtasks (
+            task_id TEXT NOT NULL REFERENCES tasks(id),
+            position INTEGER NOT NULL,
+            id TEXT NOT NULL,
+            description TEXT NOT NULL,
+            is_complete INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS tasks_by_due_date ON tasks(due_ordinal, id);
+        CREATE INDEX IF NOT EXISTS tasks_by_priority ON tasks(priority);
+        CREATE INDEX IF NOT EXISTS tasks_by_completion ON tasks(is_complete);
+        CREATE INDEX IF NOT EXISTS tasks_by_description ON tasks(description_lower);
+        CREATE INDEX IF NOT EXISTS categories_by_name ON task_categories(category_lower);
+        CREATE INDEX IF NOT EXISTS categories_by_task ON task_categories(task_id);
+        CREATE INDEX IF NOT EXISTS dependencies_by_task ON dependencies(task_id);
+        CREATE INDEX IF NOT EXISTS subtasks_by_task ON subtasks(task_id, position);
+    """)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(tasks)")}
+    for column in ("version", "revision"): # Databases created before concurrent access was supported
+        if column not in columns:
+            connection.execute(f"ALTER TABLE tasks ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    connection.execute("CREATE INDEX IF NOT EXISTS tasks_by_revision ON tasks(revision)")
+    connection.commit()
+    try:
+        connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS task_descriptions USING fts5(description, tokenize='trigram')")
+        database_has_fts = True
+    except sqlite3.OperationalError:
+        database_has_fts = False # Older SQLite builds; keyword search falls back to instr()
+    return connection
+
+def load_tasks_from_database():
+    """
+    Opens DATABASE_FILE and loads its incomplete tasks, leaving completed ones to be fetched on demand.
+    If the database is new and TASKS_FILE exists, the JSON tasks are migrated into it first.
+    """
+    global database, tasks, archived_task_count, database_revision
+    database = None
+    connection = open_database()
+    if connection.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0 and os.path.exists(TASKS_FILE):
+        migrate_json_to_database(connection)
+        database = connection
+        database_revision = 0
+        return
+
+    database = connection
+    database_revision = database.execute("SELECT COALESCE(MAX(revision), 0) FROM tasks").fetchone()[0]
+    tasks = read_database_tasks("t.is_complete = 0")
+    archived_task_count = database.execute("SELECT COUNT(*) FROM tasks WHERE is_complete = 1").fetchone()[0]
+    print(f"Loaded {len(tasks)} active tasks from {DATABASE_FILE} "
+          f"({archived_task_count} completed tasks will be loaded when needed).")
+
+def migrate_json_to_database(connection):
+    """Copies every task from TASKS_FILE (and its journal) into a new database in a single transaction."""
+    load_tasks_from_json()
+    rebuild_indexes()
+    ensure_archive_loaded()
+    with connection:
+        for task in tasks:
+            write_task_row(connection, task)
+    print(f"Migrated {len(tasks)} tasks from {TASKS_FILE} to {DATABASE_FILE}.")
+
+def write_task_row(connection, task, revision=0):
+    """Inserts or replaces a task and its categories, dependencies and subtasks. The caller commits."""
+    connection.execute(
+        "INSERT INTO tasks (id, description, description_lower, priority, due_date, due_ordinal, is_complete, "
+        "version, revision) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+        "description = excluded.description, description_lower = excluded.description_lower, "
+        "priority = excluded.priority, due_date = excluded.due_date, "
+        "due_ordinal = excluded.due_ordinal, is_complete = excluded.is_complete, "
+        "version = excluded.version, revision = excluded.revision",
+        (task["id"], task["description"], task["description"].lower(), task["priority"],
+         task["due_date"], get_due_ordinal(task), task["is_complete"], task["version"], revision))
+    connection.execute("DELETE FROM task_categories WHERE task_id = ?", (task["id"],))
+    connection.executemany("INSERT INTO task_categories (task_id, category, category_lower) VALUES (?, ?, ?)",
+                           [(task["id"], category, category.lower()) for category in task["categories"]])
+    connection.execute("DELETE FROM dependencies WHERE task_id = ?", (task["id"],))
+    connection.executemany("INSERT INTO dependencies (task_id, prerequisite_id) VALUES (?, ?)",
+                           [(task["id"], dep_id) for dep_id in task["dependencies"]])
+    connection.execute("DELETE FROM subtasks WHERE task_id = ?", (task["id"],))
+    connection.executemany("INSERT INTO subtasks (task_id, position, id, description, is_complete) VALUES (?, ?, ?, ?, ?)",
+                           [(task["id"], i, subtask["id"], subtask["description"], subtask["is_complete"])
+                            for i, subtask in enumerate(task["subtasks"])])
+    if database_has_fts:
+        rowid = connection.execute("SELECT rowid FROM tasks WHERE id = ?", (task["id"],)).fetchone()[0]
+        connection.execute("DELETE FROM task_descriptions WHERE rowid = ?", (rowid,))
+        connection.execute("INSERT INTO task_descriptions (rowid, description) VALUES (?, ?)", (rowid, task["description"]))
+
+def read_database_tasks(condition, params=(), order_by="t.rowid"):
+    """
+    Returns the tasks matching an SQL condition on the tasks table (aliased as t), in insertion order
+    unless order_by gives another SQL ordering.
+    Categories, dependencies and subtasks are fetched with one joined query each rather than one per task.
+    """
+    rows = database.execute(
+        f"SELECT t.id, t.description, t.priority, t.due_date, t.is_complete, t.version FROM tasks t "
+        f"WHERE {condition} ORDER BY {order_by}",
+        params).fetchall()
+    categories, dependencies, subtasks = {}, {}, {}
+    for task_id, category in database.execute(
+            f"SELECT c.task_id, c.category FROM task_categories c JOIN tasks t ON t.id = c.task_id "
+            f"WHERE {condition} ORDER BY c.rowid", params):
+        categories.setdefault(task_id, []).append(category)
+    for task_id, dep_id in database.execute(
+            f"SELECT d.task_id, d.prerequisite_id FROM dependencies d JOIN tasks t ON t.id = d.task_id "
+            f"WHERE {condition} ORDER BY d.rowid", params):
+        dependencies.setdefault(task_id, []).append(dep_id)
+    for task_id, subtask_id, description, is_complete in database.execute(
+            f"SELECT s.task_id, s.id, s.description, s.is_complete FROM subtasks s JOIN tasks t ON t.id = s.task_id "
+            f"WHERE {condition} ORDER BY s.task_id, s.position", params):
+        subtasks.setdefault(task_id, []).append(Subtask(subtask_id, description, bool(is_complete)))
+    return [Task(task_id, description, priority, categories.get(task_id, ()), due_date, bool(is_complete),
+                 dependencies.get(task_id, ()), subtasks.get(task_id, ()), version)
+            for task_id, description, priority, due_date, is_complete, version in rows]
+
+def query_database_tasks(sql, params=()):
+    """
+    Runs a query returning task IDs and returns the matching tasks in the same order,
+    fetching any completed tasks that have not been loaded yet.
+    """
+    global archived_task_count
+    task_ids = [row[0] for row in database.execute(sql, params)]
+    missing_ids = [task_id for task_id in task_ids if task_id not in tasks_by_id]
+    if missing_ids:
+        for task in read_database_tasks("t.id IN (SELECT value FROM json_each(?))", (json.dumps(missing_ids),)):
+            tasks.append(task)
+            index_task(task)
+            if task["is_complete"] and archived_task_count:
+                archived_task_count -= 1
+    return [tasks_by_id[task_id] for task_id in task_ids]
+
+def rebuild_indexes():
+    """Rebuilds every lookup index from scratch after the tasks list has been replaced."""
+    global tasks_by_id, sorted_task_ids, task_positions
+    global descriptions_lower, tasks_by_description, description_trigrams
+    global tasks_by_category, tasks_by_priority, due_date_index
+    tasks_by_id = {task["id"]: task for task in tasks}
+    sorted_task_ids = sorted(tasks_by_id)
+    task_positions = {task["id"]: i for i, task in enumerate(tasks)}
+    descriptions_lower = {}
+    tasks_by_description = {}
+    description_trigrams = {}
+    tasks_by_category = {}
+    tasks_by_priority = {}
+    for task in tasks:
+        index_description(task)
+        index_fields(task)
+    due_date_index = sorted((get_due_ordinal(task), task["id"]) for task in tasks)
+    del due_date_index[:bisect.bisect_left(due_date_index, (1,))] # Drop tasks without a due date
+    rebuild_dependency_graph()
+
+def index_task(task):
+    """Adds a new or edited task to the lookup indexes."""
+    if task["id"] not in tasks_by_id:
+        bisect.insort(sorted_task_ids, task["id"])
+    tasks_by_id[task["id"]] = task
+    task_positions.setdefault(task["id"], len(task_positions))
+    index_description(task)
+    index_fields(task)
+    due_ordinal = get_due_ordinal(task)
+    if due_ordinal:
+        bisect.insort(due_date_index, (due_ordinal, task["id"]))
+    if task["id"] not in pending_prerequisite_counts:
+        link_into_dependency_graph(task)
+
+def index_tasks(new_tasks):
+    """
+    Adds many tasks that are not indexed yet, such as the archive, to the lookup indexes.
+    The sorted indexes are extended and re-sorted once, which Timsort does by sorting the new
+    entries and merging them with the existing run, instead of an O(n) insort per task.
+    """
+    for task in new_tasks:
+        tasks_by_id[task["id"]] = task
+        task_positions.setdefault(task["id"], len(task_positions))
+        index_description(task)
+        index_fields(task)
+    sorted_task_ids.extend(task["id"] for task in new_tasks)
+    sorted_task_ids.sort()
+    due_date_index.extend((get_due_ordinal(task), task["id"]) for task in new_tasks if get_due_ordinal(task))
+    due_date_index.sort()
+    for task in new_tasks:
+        if task["id"] not in pending_prerequisite_counts:
+            link_into_dependency_graph(task)
+
+def unindex_task(task):
+    """Removes a task from the lookup indexes, e.g. before its fields are edited."""
+    if tasks_by_id.pop(task["id"], None) is not None:
+        i = bisect.bisect_left(sorted_task_ids, task["id"])
+        del sorted_task_ids[i]
+    unindex_description(task)
+    unindex_fields(task)
+    due_ordinal = get_due_ordinal(task)
+    if due_ordinal:
+        i = bisect.bisect_left(due_date_index, (due_ordinal, task["id"]))
+        if i < len(due_date_index) and due_date_index[i] == (due_ordinal, task["id"]):
+            del due_date_index[i]
+
+def get_trigrams(text):
+    """Returns the set of 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def index_description(task):
+    """Adds a task's description to the exact-match and trigram indexes."""
+    task_id = task["id"]
+    description = task["description"].lower()
+    descriptions_lower[task_id] = description
+    tasks_by_description.setdefault(description, set()).add(task_id)
+    for trigram in get_trigrams(description):
+        description_trigrams.setdefault(trigram, set()).add(task_id)
+
+def unindex_description(task):
+    """Removes a task from the description indexes, using the description it was indexed under."""
+    description = descriptions_lower.pop(task["id"], None)
+    if description is None:
+        return
+    matching_ids = tasks_by_description[description]
+    matching_ids.discard(task["id"])
+    if not matching_ids:
+        del tasks_by_description[description]
+    for trigram in get_trigrams(description):
+        trigram_ids = description_trigrams[trigram]
+        trigram_ids.discard(task["id"])
+        if not trigram_ids:
+            del description_trigrams[trigram]
+
+def find_tasks_by_keywords(query):
+    """
+    Returns the tasks whose description contains every word in query (case-insensitive), in list order.
+    Words of 3 or more characters narrow the candidates through the trigram index; the
+    remaining candidates are then checked with a plain substring test.
+    """
+    words = query.lower().split()
+    if database is not None:
+        return find_database_tasks_by_keywords(words)
+    ensure_archive_loaded()
+    candidates = None
+    for word in words:
+        if len(word) < 3:
+            continue
+        for trigram in sorted(get_trigrams(word), key=lambda t: len(description_trigrams.get(t, ()))):
+            trigram_ids = description_trigrams.get(trigram, set())
+            candidates = set(trigram_ids) if candidates is None else candidates & trigram_ids
+            if not candidates:
+                return []
+    if candidates is None:
+        candidates = descriptions_lower.keys()
+
+    matching_ids = [task_id for task_id in candidates
+                    if all(word in descriptions_lower[task_id] for word in words)]
+    return get_tasks_in_list_order(matching_ids)
+
+def get_tasks_in_list_order(task_ids):
+    """Returns the tasks for the given IDs, ordered as they appear in the tasks list."""
+    return [tasks_by_id[task_id] for task_id in sorted(task_ids, key=task_positions.get)]
+
+def parse_due_date(due_date):
+    """Converts a YYYY-MM-DD string to a date ordinal, or returns 0 if it is blank or invalid."""
+    try:
+        return datetime.strptime(due_date, "%Y-%m-%d").toordinal()
+    except ValueError:
+        return 0
+
+def get_due_ordinal(task):
+    """Returns the task's due date as an ordinal, or 0 if it has none."""
+    return task.due_ordinal
+
+def index_fields(task):
+    """Adds a task to the category and priority indexes."""
+    for category in task["categories"]:
+        tasks_by_category.setdefault(category.lower(), set()).add(task["id"])
+    tasks_by_priority.setdefault(task["priority"], set()).add(task["id"])
+
+def unindex_fields(task):
+    """Removes a task from the category and priority indexes, using its current field values."""
+    for category in task["categories"]:
+        category_ids = tasks_by_category.get(category.lower())
+        if category_ids is not None:
+            category_ids.discard(task["id"])
+            if not category_ids:
+                del tasks_by_category[category.lower()]
+    priority_ids = tasks_by_priority.get(task["priority"])
+    if priority_ids is not None:
+        priority_ids.discard(task["id"])
+        if not priority_ids:
+            del tasks_by_priority[task["priority"]]
+
+def find_database_tasks_by_keywords(words):
+    """SQLite version of find_tasks_by_keywords, using the FTS5 trigram index when it is available."""
+    sql = "SELECT t.id FROM tasks t"
+    conditions, params = [], []
+    long_words = [word for word in words if len(word) >= 3] if database_has_fts else []
+    if long_words:
+        sql += " JOIN task_descriptions f ON f.rowid = t.rowid"
+        conditions.append("task_descriptions MATCH ?")
+        params.append(" AND ".join('"' + word.replace('"', '""') + '"' for word in long_words))
+    for word in words:
+        if word not in long_words:
+            conditions.append("instr(t.description_lower, ?) > 0")
+            params.append(word)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return query_database_tasks(sql + " ORDER BY t.rowid", params)
+
+def get_tasks_by_category(category):
+    """Returns the tasks in a category (case-insensitive), in list order."""
+    if database is not None:
+        return query_database_tasks(
+            "SELECT t.id FROM task_categories c JOIN tasks t ON t.id = c.task_id "
+            "WHERE c.category_lower = ? ORDER BY t.rowid", (category.lower(),))
+    ensure_archive_loaded()
+    return get_tasks_in_list_order(tasks_by_category.get(category.lower(), ()))
+
+def get_tasks_by_priority(priority):
+    """Returns the tasks with the given priority, in list order."""
+    if database is not None:
+        return query_database_tasks("SELECT id FROM tasks WHERE priority = ? ORDER BY rowid", (priority,))
+    ensure_archive_loaded()
+    return get_tasks_in_list_order(tasks_by_priority.get(priority, ()))
+
+def get_tasks_due_between(start_ordinal, end_ordinal=None, incomplete_only=False):
+    """
+    Returns the tasks due on or after start_ordinal and before end_ordinal (or any time
+    after start_ordinal if end_ordinal is None), ordered by due date.
+    With incomplete_only, completed tasks are left out and never need to be loaded.
+    """
+    if database is not None:
+        sql = "SELECT id FROM tasks WHERE due_ordinal >= ? AND due_ordinal > 0"
+        params = [start_ordinal]
+        if end_ordinal is not None:
+            sql += " AND due_ordinal < ?"
+            params.append(end_ordinal)
+        if incomplete_only:
+            sql += " AND is_complete = 0"
+        return query_database_tasks(sql + " ORDER BY due_ordinal, id", params)
+
+    if not incomplete_only:
+        ensure_archive_loaded()
+    low = bisect.bisect_left(due_date_index, (start_ordinal,))
+    if end_ordinal is None:
+        high = len(due_date_index)
+    else:
+        high = bisect.bisect_left(due_date_index, (end_ordinal,), low)
+    due_tasks = [tasks_by_id[task_id] for _, task_id in due_date_index[low:high]]
+    return [task for task in due_tasks if not task["is_complete"]] if incomplete_only else due_tasks
+
+def rebuild_dependency_graph():
+    """Rebuilds the reverse dependency edges, pending prerequisite counts and ready set in O(V+E)."""
+    global dependents_by_id, pending_prerequisite_counts, ready_task_ids
+    dependents_by_id = {}
+    pending_prerequisite_counts = {}
+    ready_task_ids = set()
     for task in tasks:
-        if task["id"] == task_id:
-            return task
+        add_to_dependency_graph(task)
+
+def add_to_dependency_graph(task):
+    """Registers a task's dependency edges and works out whether it is ready to be worked on."""
+    pending = 0
+    for dep_id in task["dependencies"]:
+        dependents_by_id.setdefault(dep_id, set()).add(task["id"])
+        # Prerequisites that are not loaded are treated as met, as they always have been
+        if dep_id in tasks_by_id and not tasks_by_id[dep_id]["is_complete"]:
+            pending += 1
+    pending_prerequisite_counts[task["id"]] = pending
+    if pending == 0 and not task["is_complete"]:
+        ready_task_ids.add(task["id"])
+
+def link_into_dependency_graph(task):
+    """Adds a newly loaded task to the dependency graph, updating any tasks that already depend on it."""
+    add_to_dependency_graph(task)
+    if not task["is_complete"]:
+        # Tasks that already depend on this one counted it as met while it was not loaded
+        for dependent_id in dependents_by_id.get(task["id"], ()):
+            if dependent_id in pending_prerequisite_counts:
+                pending_prerequisite_counts[dependent_id] += 1
+                ready_task_ids.discard(dependent_id)
+
+def creates_dependency_cycle(task_id, prerequisite_id):
+    """
+    Returns True if making task_id depend on prerequisite_id would create a circular dependency,
+    i.e. if task_id is already reachable from prerequisite_id. Runs a depth-first search in O(V+E).
+    """
+    stack = [prerequisite_id]
+    visited = {prerequisite_id}
+    while stack:
+        current_id = stack.pop()
+        if current_id == task_id:
+            return True
+        current_task = tasks_by_id.get(current_id)
+        if not current_task:
+            continue
+        for dep_id in current_task["dependencies"]:
+            if dep_id not in visited:
+                visited.add(dep_id)
+                stack.append(dep_id)
+    return False
+
+def add_dependency(task, prerequisite_task):
+    """Records that task depends on prerequisite_task and updates the ready set. The caller checks for cycles."""
+    task["dependencies"].append(prerequisite_task["id"])
+    dependents_by_id.setdefault(prerequisite_task["id"], set()).add(task["id"])
+    if not prerequisite_task["is_complete"]:
+        pending_prerequisite_counts[task["id"]] = pending_prerequisite_counts.get(task["id"], 0) + 1
+        ready_task_ids.discard(task["id"])
+
+def complete_task(task):
+    """Marks a task complete and releases any dependents whose last pending prerequisite it was."""
+    task["is_complete"] = True
+    ready_task_ids.discard(task["id"])
+    for dependent_id in dependents_by_id.get(task["id"], ()):
+        pending_prerequisite_counts[dependent_id] -= 1
+        if pending_prerequisite_counts[dependent_id] == 0 and not tasks_by_id[dependent_id]["is_complete"]:
+            ready_task_ids.add(dependent_id)
+
+def reopen_task(task):
+    """Marks a completed task incomplete again (only needed when applying another session's state)."""
+    task["is_complete"] = False
+    for dependent_id in dependents_by_id.get(task["id"], ()):
+        if dependent_id in pending_prerequisite_counts:
+            if pending_prerequisite_counts[dependent_id] == 0:
+                ready_task_ids.discard(dependent_id)
+            pending_prerequisite_counts[dependent_id] += 1
+    if not pending_prerequisite_counts.get(task["id"]):
+        ready_task_ids.add(task["id"])
+
+def set_dependencies(task, dependencies):
+    """Replaces a task's whole dependency list, re-registering its edges in the dependency graph."""
+    for dep_id in task["dependencies"]:
+        dependents_by_id.get(dep_id, set()).discard(task["id"])
+    ready_task_ids.discard(task["id"])
+    task["dependencies"] = [sys.intern(dep_id) for dep_id in dependencies]
+    add_to_dependency_graph(task)
+
+def get_pending_prerequisites(task):
+    """Returns the prerequisites of task that are not yet complete."""
+    if not pending_prerequisite_counts.get(task["id"]):
+        return []
+    return [tasks_by_id[dep_id] for dep_id in task["dependencies"]
+            if dep_id in tasks_by_id and not tasks_by_id[dep_id]["is_complete"]]
+
+def get_task_by_id(task_id):
+    """Finds and returns a task by its full ID, loading completed tasks from disk if needed."""
+    task = tasks_by_id.get(task_id)
+    if task is None and archived_task_count:
+        if database is not None:
+            found = query_database_tasks("SELECT id FROM tasks WHERE id = ?", (task_id,))
+            return found[0] if found else None
+        if not load_archived_tasks_by_prefix(task_id, limit=1):
+            ensure_archive_loaded()
+        task = tasks_by_id.get(task_id)
+    return task
+
+def get_task_ids_by_prefix(prefix, limit=None):
+    """Returns the IDs starting with prefix (at most limit of them) using a binary search of sorted_task_ids."""
+    if database is not None and archived_task_count:
+        # Range scan on the primary key instead of loading every completed task
+        rows = database.execute("SELECT id FROM tasks WHERE id >= ? ORDER BY id LIMIT ?",
+                                (prefix, -1 if limit is None else limit)).fetchall()
+        return [task["id"] for task in query_database_tasks(
+            "SELECT value FROM json_each(?)", (json.dumps([row[0] for row in rows if row[0].startswith(prefix)]),))]
+    if archived_task_count and not load_archived_tasks_by_prefix(prefix, limit):
+        ensure_archive_loaded()
+    matches = []
+    i = bisect.bisect_left(sorted_task_ids, prefix)
+    while i < len(sorted_task_ids) and sorted_task_ids[i].startswith(prefix):
+        matches.append(sorted_task_ids[i])
+        if limit is not None and len(matches) >= limit:
+            break
+        i += 1
+    return matches
+
+def resolve_task_id(task_id, not_found_message="Task not found."):
+    """
+    Finds a task from an ID typed by the user, which may be the full ID or any
+    unique prefix of it such as the 8-character IDs shown in the task lists.
+    Prints not_found_message (or an ambiguity warning) and returns None if no single task matches.
+    """
+    task = get_task_by_id(task_id)
+    if task:
+        return task
+
+    matches = get_task_ids_by_prefix(task_id, limit=5) if task_id else []
+    if len(matches) == 1:
+        return tasks_by_id[matches[0]]
+    if matches:
+        print(f"ID '{task_id}' matches more than one task. Please enter more characters of the ID:")
+        for match in matches:
+            print(f"- [ID: {match}] {tasks_by_id[match]['description']}")
+    else:
+        print(not_found_message)
     return None
 
 def get_task_description_by_id(task_id):
@@ -50,10 +1215,86 @@ def get_task_description_by_id(task_id):
 
 def get_task_id_by_description(description):
     """Returns the ID of the first task found with a given description."""
-    for task in tasks:
-        if task["description"].lower() == description.lower():
-            return task["id"]
-    return None
+    matching_ids = tasks_by_description.get(description.lower())
+    if not matching_ids and archived_task_count:
+        if database is not None:
+            found = query_database_tasks("SELECT id FROM tasks WHERE description_lower = ? ORDER BY rowid LIMIT 1",
+                                         (description.lower(),))
+            return found[0]["id"] if found else None
+        ensure_archive_loaded()
+        matching_ids = tasks_by_description.get(description.lower())
+    return min(matching_ids, key=task_positions.get) if matching_ids else None
+
+# --- Rendering ---
+
+def view_sort_key(task):
+    """Sort key for view_tasks: incomplete first, then by priority, then by due date."""
+    return (task["is_complete"], PRIORITY_RANK.get(task["priority"], 99), task["due_date"] if task["due_date"] else "9999-12-31")
+
+def format_task_lines(task, number, show_details):
+    """Yields the output lines for one task; show_details adds the dependencies and subtasks shown by view_tasks."""
+    status = "[COMPLETED]" if task["is_complete"] else "[PENDING]"
+    categories_str = f" ({', '.join(task['categories'])})" if task["categories"] else ""
+    due_date_str = f" (Due: {task['due_date']})" if task["due_date"] else ""
+    spacing = "\n" if show_details else ""
+    yield f"{spacing}{number}. {status} [ID: {task['id'][:8]}] {task['description']} [Priority: {task['priority']}] {categories_str}{due_date_str}\n"
+    if not show_details:
+        return
+
+    # Display dependencies
+    if task["dependencies"]:
+        dep_descriptions = [get_task_description_by_id(dep_id) for dep_id in task["dependencies"]]
+        yield f"    Depends on: {', '.join(dep_descriptions)}\n"
+
+    # Display subtasks
+    if task["subtasks"]:
+        yield "    Subtasks:\n"
+        for sub_i, subtask in enumerate(task["subtasks"]):
+            sub_status = "[DONE]" if subtask["is_complete"] else "[TODO]"
+            yield f"        {sub_i+1}. {sub_status} {subtask['description']}\n"
+
+def write_lines(lines, output):
+    """Writes lines to output in chunks of RENDER_CHUNK_LINES rather than one call per line."""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= RENDER_CHUNK_LINES:
+            output.write("".join(chunk))
+            chunk.clear()
+    output.write("".join(chunk))
+    output.flush()
+
+def render_tasks(task_list, sort_key=None, show_details=False, page_size=None, output=None):
+    """
+    Prints a numbered list of tasks a page at a time, asking before each further page.
+    When input is piped rather than typed, everything is printed at once instead, because the
+    pager's prompt would swallow the next line meant for the menu.
+
+    Lines are formatted lazily and written in chunks. When sort_key is given, only the tasks needed
+    up to the end of the current page are sorted, using a heap (heapq.nsmallest is stable, so the
+    order matches a full sort), so the first page of a huge list appears without sorting all of it.
+    """
+    output = output or sys.stdout
+    total = len(task_list)
+    page_size = page_size or PAGE_SIZE or total
+    if not sys.stdin.isatty():
+        page_size = total
+    offset = 0
+    while offset < total:
+        end = min(offset + page_size, total)
+        if sort_key is None:
+            page = task_list[offset:end]
+        elif offset == 0 and end == total:
+            page = sorted(task_list, key=sort_key)
+        else:
+            page = heapq.nsmallest(end, task_list, key=sort_key)[offset:]
+        write_lines((line for number, task in enumerate(page, start=offset + 1)
+                     for line in format_task_lines(task, number, show_details)), output)
+        offset = end
+        if offset < total:
+            answer = input(f"-- Showing {offset} of {total} tasks. Press Enter for more, or 'q' to stop: ")
+            if answer.strip().lower() == 'q':
+                break
 
 # --- Main Application Functions ---
 
@@ -96,22 +1337,21 @@ def add_task():
             print("Invalid date format. Due date not set.")
             due_date = ""
 
-    new_task = {
-        "id": str(uuid.uuid4()), # Generate a unique ID for the task
-        "description": description,
-        "priority": priority,
-        "categories": categories,
-        "due_date": due_date,
-        "is_complete": False,
-        "dependencies": [], # List of task IDs that this task depends on
-        "subtasks": [] # List of subtask dictionaries
-    }
+    new_task = Task(
+        str(uuid.uuid4()), # Generate a unique ID for the task
+        description,
+        priority,
+        categories,
+        due_date
+    )
     tasks.append(new_task)
+    index_task(new_task)
+    record_change(new_task)
     print("Task added successfully!")
 
 def view_tasks():
     """Displays all tasks, optionally grouped/filtered."""
-    if not tasks:
+    if not tasks and not archived_task_count:
         print("\nYour to-do list is empty!")
         return
 
@@ -122,30 +1362,33 @@ def view_tasks():
     print("4. View by Category")
     print("5. View by Priority")
     print("6. View by Due Date (Upcoming)")
+    print("7. View Ready Tasks (all dependencies complete)")
     print("-----------------------")
     choice = input("Enter your viewing choice: ").strip()
 
     filtered_tasks = []
-    today = datetime.now().date()
+    today = datetime.now().date().toordinal()
+    if choice in ('1', '3'):
+        # These views can include completed tasks, which may still be on disk
+        ensure_archive_loaded()
 
     if choice == '1':
-        filtered_tasks = tasks
+        filtered_tasks = tasks # render_tasks never reorders the list it is given
     elif choice == '2':
         filtered_tasks = [task for task in tasks if not task["is_complete"]]
     elif choice == '3':
         filtered_tasks = [task for task in tasks if task["is_complete"]]
     elif choice == '4':
         category_filter = input("Enter category to filter by: ").strip()
-        filtered_tasks = [task for task in tasks if category_filter.lower() in [c.lower() for c in task["categories"]]]
+        filtered_tasks = get_tasks_by_category(category_filter)
     elif choice == '5':
         priority_filter = input("Enter priority to filter by (High/Medium/Low): ").strip().capitalize()
-        filtered_tasks = [task for task in tasks if task["priority"] == priority_filter]
+        filtered_tasks = get_tasks_by_priority(priority_filter)
     elif choice == '6':
-        # Sort tasks by due date for upcoming view
-        upcoming_tasks = [task for task in tasks if task["due_date"] and not task["is_complete"]]
-        # Filter for tasks with a valid due date that is today or in the future
-        upcoming_tasks = [task for task in upcoming_tasks if datetime.strptime(task["due_date"], "%Y-%m-%d").date() >= today]
-        filtered_tasks = sorted(upcoming_tasks, key=lambda x: datetime.strptime(x["due_date"], "%Y-%m-%d"))
+        # The due date index is already sorted, so upcoming tasks are a range scan from today
+        filtered_tasks = get_tasks_due_between(today, incomplete_only=True)
+    elif choice == '7':
+        filtered_tasks = get_tasks_in_list_order(ready_task_ids)
     else:
         print("Invalid viewing choice.")
         return
@@ -155,27 +1398,7 @@ def view_tasks():
         return
 
     # Sort tasks by completion status, then priority, then due date
-    filtered_tasks.sort(key=lambda x: (x["is_complete"],
-                                        {"High": 0, "Medium": 1, "Low": 2}.get(x["priority"], 99),
-                                        x["due_date"] if x["due_date"] else "9999-12-31"))
-
-    for i, task in enumerate(filtered_tasks):
-        status = "[COMPLETED]" if task["is_complete"] else "[PENDING]"
-        categories_str = f" ({', '.join(task['categories'])})" if task["categories"] else ""
-        due_date_str = f" (Due: {task['due_date']})" if task["due_date"] else ""
-        print(f"\n{i+1}. {status} [ID: {task['id'][:8]}] {task['description']} [Priority: {task['priority']}] {categories_str}{due_date_str}")
-
-        # Display dependencies
-        if task["dependencies"]:
-            dep_descriptions = [get_task_description_by_id(dep_id) for dep_id in task["dependencies"]]
-            print(f"    Depends on: {', '.join(dep_descriptions)}")
-
-        # Display subtasks
-        if task["subtasks"]:
-            print("    Subtasks:")
-            for sub_i, subtask in enumerate(task["subtasks"]):
-                sub_status = "[DONE]" if subtask["is_complete"] else "[TODO]"
-                print(f"        {sub_i+1}. {sub_status} {subtask['description']}")
+    render_tasks(filtered_tasks, sort_key=view_sort_key, show_details=True)
     print("-----------------------")
 
 
@@ -187,10 +1410,9 @@ def mark_complete():
         return
 
     task_id_to_complete = input("Enter the ID of the task to mark as complete: ").strip()
-    task = get_task_by_id(task_id_to_complete)
+    task = resolve_task_id(task_id_to_complete)
 
     if not task:
-        print("Task not found.")
         return
 
     if task["is_complete"]:
@@ -198,36 +1420,36 @@ def mark_complete():
         return
 
     # Check dependencies
-    pending_dependencies = [
-        get_task_description_by_id(dep_id) for dep_id in task["dependencies"]
-        if get_task_by_id(dep_id) and not get_task_by_id(dep_id)["is_complete"]
-    ]
+    pending_dependencies = get_pending_prerequisites(task)
 
     if pending_dependencies:
         print(f"Cannot complete '{task['description']}'. The following dependencies are not yet complete:")
-        for dep_desc in pending_dependencies:
-            print(f"- {dep_desc}")
+        for dep_task in pending_dependencies:
+            print(f"- {dep_task['description']}")
         return
 
-    task["is_complete"] = True
-    print(f"Task '{task['description']}' marked as complete!")
+    begin_change(task)
+    complete_task(task)
+    if record_change(task):
+        print(f"Task '{task['description']}' marked as complete!")
 
 def edit_task():
     """Allows the user to edit an existing task's details."""
     print("\n--- Edit Task ---")
-    if not tasks:
+    if not tasks and not archived_task_count:
         print("No tasks to edit.")
         return
 
     task_id_to_edit = input("Enter the ID of the task to edit: ").strip()
-    task = get_task_by_id(task_id_to_edit)
+    task = resolve_task_id(task_id_to_edit)
 
     if not task:
-        print("Task not found.")
         return
 
     print(f"Editing task: '{task['description']}'")
     print("Leave field blank to keep current value.")
+    begin_change(task)
+    unindex_task(task)
 
     new_description = input(f"New description (current: {task['description']}): ").strip()
     if new_description:
@@ -254,31 +1476,34 @@ def edit_task():
     elif new_due_date == "": # Allow clearing due date
         task["due_date"] = ""
 
-    print("Task updated successfully!")
+    index_task(task)
+    if record_change(task):
+        print("Task updated successfully!")
 
 def search_tasks():
     """Searches for tasks by keyword, category, or due date."""
     print("\n--- Search Tasks ---")
-    if not tasks:
+    if not tasks and not archived_task_count:
         print("No tasks to search.")
         return
 
     print("Search by:")
-    print("1. Keyword (in description)")
+    print("1. Keyword(s) (in description)")
     print("2. Category")
     print("3. Due Date")
     search_choice = input("Enter your search choice: ").strip()
 
     search_results = []
     if search_choice == '1':
-        keyword = input("Enter keyword to search: ").strip().lower()
-        search_results = [task for task in tasks if keyword in task["description"].lower()]
+        keyword = input("Enter keyword(s) to search: ").strip()
+        search_results = find_tasks_by_keywords(keyword)
     elif search_choice == '2':
-        category = input("Enter category to search: ").strip().lower()
-        search_results = [task for task in tasks if category in [c.lower() for c in task["categories"]]]
+        category = input("Enter category to search: ").strip()
+        search_results = get_tasks_by_category(category)
     elif search_choice == '3':
         due_date_str = input("Enter due date (YYYY-MM-DD) to search: ").strip()
-        search_results = [task for task in tasks if task["due_date"] == due_date_str]
+        due_ordinal = parse_due_date(due_date_str)
+        search_results = get_tasks_due_between(due_ordinal, due_ordinal + 1) if due_ordinal else []
     else:
         print("Invalid search choice.")
         return
@@ -288,25 +1513,20 @@ def search_tasks():
         return
 
     print("\n--- Search Results ---")
-    for i, task in enumerate(search_results):
-        status = "[COMPLETED]" if task["is_complete"] else "[PENDING]"
-        categories_str = f" ({', '.join(task['categories'])})" if task["categories"] else ""
-        due_date_str = f" (Due: {task['due_date']})" if task["due_date"] else ""
-        print(f"{i+1}. {status} [ID: {task['id'][:8]}] {task['description']} [Priority: {task['priority']}] {categories_str}{due_date_str}")
+    render_tasks(search_results)
     print("-----------------------")
 
 def manage_subtasks():
     """Manages subtasks for a given parent task."""
     print("\n--- Manage Subtasks ---")
-    if not tasks:
+    if not tasks and not archived_task_count:
         print("No tasks to manage subtasks for.")
         return
 
     task_id = input("Enter the ID of the parent task: ").strip()
-    parent_task = get_task_by_id(task_id)
+    parent_task = resolve_task_id(task_id, "Parent task not found.")
 
     if not parent_task:
-        print("Parent task not found.")
         return
 
     while True:
@@ -327,8 +1547,10 @@ def manage_subtasks():
         if sub_choice == '1':
             sub_description = input("Enter subtask description: ").strip()
             if sub_description:
-                parent_task["subtasks"].append({"id": str(uuid.uuid4()), "description": sub_description, "is_complete": False})
-                print("Subtask added.")
+                begin_change(parent_task)
+                parent_task["subtasks"].append(Subtask(str(uuid.uuid4()), sub_description))
+                if record_change(parent_task):
+                    print("Subtask added.")
             else:
                 print("Subtask description cannot be empty.")
         elif sub_choice == '2':
@@ -338,8 +1560,10 @@ def manage_subtasks():
             try:
                 sub_index = int(input("Enter the number of the subtask to mark complete: ")) - 1
                 if 0 <= sub_index < len(parent_task["subtasks"]):
+                    begin_change(parent_task)
                     parent_task["subtasks"][sub_index]["is_complete"] = True
-                    print("Subtask marked complete.")
+                    if record_change(parent_task):
+                        print("Subtask marked complete.")
                 else:
                     print("Invalid subtask number.")
             except ValueError:
@@ -352,26 +1576,25 @@ def manage_subtasks():
 def manage_dependencies():
     """Allows adding dependencies between tasks."""
     print("\n--- Manage Dependencies ---")
-    if len(tasks) < 2:
+    if len(tasks) + archived_task_count < 2:
         print("You need at least two tasks to set up dependencies.")
         return
 
+    ensure_archive_loaded() # The reference list shows completed tasks too
     print("Existing Tasks (for reference):")
     for task in tasks:
         print(f"- [ID: {task['id'][:8]}] {task['description']}")
 
     task_id = input("Enter the ID of the task that will have a dependency: ").strip()
-    dependent_task = get_task_by_id(task_id)
+    dependent_task = resolve_task_id(task_id)
 
     if not dependent_task:
-        print("Task not found.")
         return
 
     dependency_id = input("Enter the ID of the task that MUST be completed BEFORE this one: ").strip()
-    prerequisite_task = get_task_by_id(dependency_id)
+    prerequisite_task = resolve_task_id(dependency_id, "Prerequisite task not found.")
 
     if not prerequisite_task:
-        print("Prerequisite task not found.")
         return
 
     if dependent_task["id"] == prerequisite_task["id"]:
@@ -382,22 +1605,166 @@ def manage_dependencies():
         print(f"Task '{dependent_task['description']}' already depends on '{prerequisite_task['description']}'.")
         return
 
-    # Optional: Implement a check for circular dependencies if time allows.
-    # For now, we assume users will not create circular dependencies.
+    if creates_dependency_cycle(dependent_task["id"], prerequisite_task["id"]):
+        print(f"Cannot add dependency: '{prerequisite_task['description']}' already depends (directly or indirectly) on '{dependent_task['description']}'.")
+        return
 
-    dependent_task["dependencies"].append(prerequisite_task["id"])
-    print(f"Dependency added: Task '{dependent_task['description']}' now depends on '{prerequisite_task['description']}'.")
+    begin_change(dependent_task)
+    add_dependency(dependent_task, prerequisite_task)
+    if record_change(dependent_task):
+        print(f"Dependency added: Task '{dependent_task['description']}' now depends on '{prerequisite_task['description']}'.")
 
 def check_reminders():
     """Checks for tasks due today and prints reminders."""
-    today = datetime.now().strftime("%Y-%m-%d")
-    reminders = [task for task in tasks if task["due_date"] == today and not task["is_complete"]]
+    today = datetime.now().date().toordinal()
+    reminders = get_tasks_due_between(today, today + 1, incomplete_only=True)
     if reminders:
         print("\n--- REMINDERS (Due Today!) ---")
         for task in reminders:
             print(f"- [ID: {task['id'][:8]}] {task['description']} (Priority: {task['priority']})")
         print("-------------------------------")
 
+# --- Batch Command Interface ---
+
+def find_batch_task(task_id):
+    """Returns the task with the given full or shortened ID, raising ValueError if there isn't exactly one."""
+    task = get_task_by_id(task_id)
+    if task:
+        return task
+    matches = get_task_ids_by_prefix(task_id, limit=2) if task_id else []
+    if len(matches) == 1:
+        return tasks_by_id[matches[0]]
+    if matches:
+        raise ValueError(f"ID '{task_id}' matches more than one task")
+    raise ValueError(f"Task '{task_id}' not found")
+
+def check_batch_fields(operation):
+    """Validates the fields of an add or edit operation, raising ValueError if any is invalid."""
+    for field in ("description", "priority", "due_date"):
+        if field in operation and not isinstance(operation[field], str):
+            raise ValueError(f"{field.capitalize().replace('_', ' ')} must be a string")
+    if "priority" in operation and operation["priority"].capitalize() not in PRIORITY_OPTIONS:
+        raise ValueError(f"Invalid priority '{operation['priority']}'")
+    if operation.get("due_date") and not parse_due_date(operation["due_date"]):
+        raise ValueError(f"Invalid due date '{operation['due_date']}', expected YYYY-MM-DD")
+    if "categories" in operation and not (isinstance(operation["categories"], list)
+                                          and all(isinstance(category, str) for category in operation["categories"])):
+        raise ValueError("Categories must be a list of strings")
+
+def apply_batch_operation(operation):
+    """
+    Applies one batch operation and returns a dictionary describing its result.
+
+    Supported operations (the "op" key) and their other keys:
+        add             description, priority, categories (list), due_date
+        edit            id, plus any of description, priority, categories, due_date
+        complete        id
+        add_dependency  id, depends_on
+        add_subtask     id, description
+        search          one of keyword, category or due_date
+
+    Raises ValueError if the operation is malformed or cannot be applied.
+    """
+    op = operation.get("op")
+    if op == "add":
+        check_batch_fields(operation)
+        if not operation.get("description", "").strip():
+            raise ValueError("Task description cannot be empty")
+        task = Task(str(uuid.uuid4()), operation["description"].strip(),
+                    operation.get("priority", "Medium").capitalize(),
+                    operation.get("categories", []), operation.get("due_date", ""))
+        tasks.append(task)
+        index_task(task)
+        record_change(task)
+        return {"id": task["id"]}
+
+    if op == "search":
+        if "keyword" in operation:
+            results = find_tasks_by_keywords(operation["keyword"])
+        elif "category" in operation:
+            results = get_tasks_by_category(operation["category"])
+        elif "due_date" in operation:
+            due_ordinal = parse_due_date(operation["due_date"])
+            results = get_tasks_due_between(due_ordinal, due_ordinal + 1) if due_ordinal else []
+        else:
+            raise ValueError("Search needs a keyword, category or due_date")
+        return {"results": [task["id"] for task in results]}
+
+    if op not in ("edit", "complete", "add_dependency", "add_subtask"):
+        raise ValueError(f"Unknown operation '{op}'")
+    task = find_batch_task(operation.get("id", ""))
+    if op == "edit":
+        check_batch_fields(operation)
+        begin_change(task)
+        unindex_task(task)
+        if operation.get("description", "").strip():
+            task["description"] = operation["description"].strip()
+        if "priority" in operation:
+            task["priority"] = operation["priority"].capitalize()
+        if "categories" in operation:
+            task["categories"] = operation["categories"]
+        if "due_date" in operation:
+            task["due_date"] = operation["due_date"]
+        index_task(task)
+    elif op == "complete":
+        if task["is_complete"]:
+            raise ValueError(f"Task '{task['description']}' is already complete")
+        pending_dependencies = get_pending_prerequisites(task)
+        if pending_dependencies:
+            raise ValueError(f"Task '{task['description']}' has incomplete dependencies: "
+                             + ", ".join(dep_task["id"] for dep_task in pending_dependencies))
+        begin_change(task)
+        complete_task(task)
+    elif op == "add_dependency":
+        prerequisite_task = find_batch_task(operation.get("depends_on", ""))
+        if prerequisite_task["id"] == task["id"]:
+            raise ValueError("A task cannot depend on itself")
+        if prerequisite_task["id"] in task["dependencies"]:
+            raise ValueError("Dependency already exists")
+        if creates_dependency_cycle(task["id"], prerequisite_task["id"]):
+            raise ValueError("Dependency would create a cycle")
+        begin_change(task)
+        add_dependency(task, prerequisite_task)
+    elif op == "add_subtask":
+        check_batch_fields(operation)
+        if not operation.get("description", "").strip():
+            raise ValueError("Subtask description cannot be empty")
+        subtask = Subtask(str(uuid.uuid4()), operation["description"].strip())
+        begin_change(task)
+        task["subtasks"].append(subtask)
+        if not record_change(task):
+            raise ValueError("Conflicting change saved by another session")
+        return {"id": task["id"], "subtask_id": subtask["id"]}
+    if not record_change(task):
+        raise ValueError("Conflicting change saved by another session")
+    return {"id": task["id"]}
+
+def run_batch(input_stream, output_stream):
+    """
+    Applies a stream of JSON operations (one per line) with a single load and a single save,
+    writing one JSON result line per operation to output_stream.
+    Status messages (from loading, saving, and syncing with other sessions along the way) go to
+    stderr so the output stays machine-readable.
+    Returns the number of operations that failed.
+    """
+    failures = 0
+    with contextlib.redirect_stdout(sys.stderr):
+        load_tasks()
+        for line_number, line in enumerate(input_stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                operation = json.loads(line)
+                result = {"line": line_number, "ok": True}
+                result.update(apply_batch_operation(operation))
+            except (ValueError, AttributeError, TypeError) as e:
+                # json.JSONDecodeError is a ValueError; wrongly typed fields raise the other two
+                failures += 1
+                result = {"line": line_number, "ok": False, "error": str(e)}
+            output_stream.write(json.dumps(result) + "\n")
+        save_tasks()
+    return failures
+
 # --- Main Application Loop ---
 
 def main():
@@ -406,6 +1773,7 @@ def main():
     check_reminders()
 
     while True:
+        sync_changes() # Pick up anything other sessions saved while we were waiting for input
         display_menu()
         choice = input("Enter your choice: ").strip()
 
@@ -431,4 +1799,25 @@ def main():
             print("Invalid choice. Please try again.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="To-do list application.")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="apply JSON operations from FILE ('-' for stdin) instead of showing the menu")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default=STORAGE_BACKEND,
+                        help=f"where tasks are kept: {TASKS_FILE} with a change journal, or an SQLite "
+                             f"database in {DATABASE_FILE} (migrated from {TASKS_FILE} on first use)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                        help="tasks shown per page in views and search results (0 shows all at once)")
+    args = parser.parse_args()
+    if args.page_size < 0:
+        parser.error("--page-size must be 0 or more")
+    STORAGE_BACKEND = args.storage
+    PAGE_SIZE = args.page_size
+
+    if args.batch:
+        if args.batch == '-':
+            failed = run_batch(sys.stdin, sys.stdout)
+        else:
+            with open(args.batch, 'r') as batch_file:
+                failed = run_batch(batch_file, sys.stdout)
+        sys.exit(1 if failed else 0)
     main()